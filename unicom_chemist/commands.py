@@ -0,0 +1,23 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-branch-sales-rollup")
+@click.option("--from-date", help="First posting date to rebuild, defaults to the first invoice")
+@click.option("--to-date", help="Last posting date to rebuild, defaults to today")
+@pass_context
+def rebuild_branch_sales_rollup(context, from_date=None, to_date=None):
+	"""Re-aggregate the Branch Sales Rollup from submitted invoices"""
+	import frappe
+
+	from unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup import rebuild
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		rebuild(from_date, to_date)
+	finally:
+		frappe.destroy()
+
+
+commands = [rebuild_branch_sales_rollup]
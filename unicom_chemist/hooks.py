@@ -45,9 +45,10 @@ app_license = "mit"
 # include js in doctype views
 doctype_js = {
     "Sales Invoice" : "public/js/sales_invoice.js",
-    "Stock Entry" : "public/js/stock_entry.js"
+    "Stock Entry" : "public/js/stock_entry.js",
+    "Payroll Entry" : "public/js/payroll_entry.js"
 }
-# doctype_list_js = {"doctype" : "public/js/doctype_list.js"}
+doctype_list_js = {"Item" : "public/js/item_list.js"}
 # doctype_tree_js = {"doctype" : "public/js/doctype_tree.js"}
 # doctype_calendar_js = {"doctype" : "public/js/doctype_calendar.js"}
 
@@ -86,7 +87,7 @@ doctype_js = {
 # ------------
 
 # before_install = "unicom_chemist.install.before_install"
-# after_install = "unicom_chemist.install.after_install"
+after_install = "unicom_chemist.install.after_install"
 
 # Uninstallation
 # ------------
@@ -134,41 +135,135 @@ doctype_js = {
 
 override_doctype_class = {
 	"Sales Invoice": "unicom_chemist.unicom_chemist.sales_invoice.CustomSalesInvoice",
-	"Salary Slip": "unicom_chemist.unicom_chemist.salary_slip_override.CustomSalarySlip"
+	"Salary Slip": "unicom_chemist.unicom_chemist.salary_slip_override.CustomSalarySlip",
+	"Payroll Entry": "unicom_chemist.unicom_chemist.payroll_entry_override.CustomPayrollEntry"
 }
 
 # Document Events
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"Sales Invoice": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series",
+		"after_insert": "unicom_chemist.unicom_chemist.doctype.invoice_name_index.invoice_name_index.on_invoice_insert",
+		"on_trash": "unicom_chemist.unicom_chemist.doctype.invoice_name_index.invoice_name_index.on_invoice_trash",
+		"on_submit": [
+			"unicom_chemist.unicom_chemist.invoice_report.on_invoice_change",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change"
+		],
+		"on_cancel": [
+			"unicom_chemist.unicom_chemist.invoice_report.on_invoice_change",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change"
+		],
+		"on_update_after_submit": [
+			"unicom_chemist.unicom_chemist.invoice_report.on_invoice_change",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change"
+		]
+	},
+	"Payment Entry": {
+		"on_submit": [
+			"unicom_chemist.unicom_chemist.invoice_report.on_payment_entry_change",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_payment_entry_change"
+		],
+		"on_cancel": [
+			"unicom_chemist.unicom_chemist.invoice_report.on_payment_entry_change",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_payment_entry_change"
+		]
+	},
+	"POS Invoice": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series",
+		"on_submit": "unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change",
+		"on_cancel": "unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change",
+		"on_update_after_submit": "unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.on_invoice_change"
+	},
+	"Sales Order": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Quotation": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Purchase Order": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Purchase Receipt": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Purchase Invoice": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series",
+		"on_submit": "unicom_chemist.unicom_chemist.dashboard_cache.on_purchase_invoice_change",
+		"on_cancel": "unicom_chemist.unicom_chemist.dashboard_cache.on_purchase_invoice_change"
+	},
+	"Material Request": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Stock Entry": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_naming_series"
+	},
+	"Item": {
+		"before_insert": "unicom_chemist.unicom_chemist.naming.set_item_naming_series",
+		"after_insert": "unicom_chemist.unicom_chemist.barcode.set_item_barcode"
+	},
+	"Branch": {
+		"on_update": "unicom_chemist.unicom_chemist.naming.clear_branch_cache",
+		"after_rename": "unicom_chemist.unicom_chemist.naming.clear_branch_cache",
+		"on_trash": "unicom_chemist.unicom_chemist.naming.clear_branch_cache"
+	},
+	"POS Profile": {
+		"on_update": "unicom_chemist.unicom_chemist.naming.clear_pos_profile_cache",
+		"after_rename": "unicom_chemist.unicom_chemist.naming.clear_pos_profile_cache",
+		"on_trash": "unicom_chemist.unicom_chemist.naming.clear_pos_profile_cache"
+	},
+	"Warehouse": {
+		"on_update": "unicom_chemist.unicom_chemist.warehouse_branch.clear_warehouse_branch_cache",
+		"after_rename": "unicom_chemist.unicom_chemist.warehouse_branch.clear_warehouse_branch_cache",
+		"on_trash": "unicom_chemist.unicom_chemist.warehouse_branch.clear_warehouse_branch_cache"
+	},
+	"Item Group": {
+		"on_update": "unicom_chemist.unicom_chemist.naming.clear_item_group_cache",
+		"after_rename": "unicom_chemist.unicom_chemist.naming.clear_item_group_cache",
+		"on_trash": "unicom_chemist.unicom_chemist.naming.clear_item_group_cache"
+	},
+	"Serial and Batch Bundle": {
+		"on_update": "unicom_chemist.unicom_chemist.batch_expiry.on_bundle_change",
+		"on_update_after_submit": "unicom_chemist.unicom_chemist.batch_expiry.on_bundle_change",
+		"on_submit": "unicom_chemist.unicom_chemist.dashboard_cache.on_stock_change",
+		"on_cancel": [
+			"unicom_chemist.unicom_chemist.batch_expiry.on_bundle_change",
+			"unicom_chemist.unicom_chemist.dashboard_cache.on_stock_change"
+		],
+		"on_trash": "unicom_chemist.unicom_chemist.batch_expiry.on_bundle_change"
+	},
+	"Batch": {
+		"on_update": [
+			"unicom_chemist.unicom_chemist.batch_expiry.on_batch_change",
+			"unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status.on_batch_change",
+			"unicom_chemist.unicom_chemist.dashboard_cache.on_stock_change"
+		],
+		"on_trash": [
+			"unicom_chemist.unicom_chemist.batch_expiry.on_batch_change",
+			"unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status.on_batch_change"
+		]
+	}
+}
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"unicom_chemist.tasks.all"
-# 	],
-# 	"daily": [
-# 		"unicom_chemist.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"unicom_chemist.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"unicom_chemist.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"unicom_chemist.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"daily": [
+		"unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status.update_batch_expiry_status"
+	],
+	"daily_long": [
+		"unicom_chemist.unicom_chemist.doctype.item_movement_class.item_movement_class.classify_items"
+	],
+	"cron": {
+		"*/15 * * * *": [
+			"unicom_chemist.unicom_chemist.dashboard_cache.precompute_dashboards",
+			"unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup.enqueue_dirty_refresh"
+		]
+	},
+}
 
 # Testing
 # -------
@@ -282,7 +377,7 @@ fixtures = [
     "Server Script",
     #"Tax Category",
     #"Workspace",
-    #"Custom HTML Block",
+    "Custom HTML Block",
     #"Custom DocPerm",
     #"Workflow",
     #"Workflow State",
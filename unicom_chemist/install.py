@@ -0,0 +1,10 @@
+from unicom_chemist.unicom_chemist.barcode import seed_barcode_series
+from unicom_chemist.unicom_chemist.income_tax import create_default_config
+from unicom_chemist.unicom_chemist.query_indexes import ensure_indexes
+
+
+def after_install():
+	# Patches are only marked as run on install, so add what they would have added
+	ensure_indexes()
+	seed_barcode_series()
+	create_default_config()
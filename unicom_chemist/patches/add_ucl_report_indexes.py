@@ -0,0 +1,5 @@
+from unicom_chemist.unicom_chemist.query_indexes import ensure_indexes
+
+
+def execute():
+	ensure_indexes()
@@ -0,0 +1,7 @@
+from unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status import (
+	update_batch_expiry_status,
+)
+
+
+def execute():
+	update_batch_expiry_status()
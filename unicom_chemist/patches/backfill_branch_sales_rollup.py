@@ -0,0 +1,5 @@
+from unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup import rebuild
+
+
+def execute():
+	rebuild()
@@ -0,0 +1,5 @@
+from unicom_chemist.unicom_chemist.doctype.invoice_name_index.invoice_name_index import backfill
+
+
+def execute():
+	backfill()
@@ -0,0 +1,5 @@
+from unicom_chemist.unicom_chemist.income_tax import create_default_config
+
+
+def execute():
+	create_default_config()
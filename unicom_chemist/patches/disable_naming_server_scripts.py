@@ -0,0 +1,20 @@
+import frappe
+
+
+# Server scripts replaced by unicom_chemist.unicom_chemist.naming
+NAMING_SERVER_SCRIPTS = (
+	"Sales Invoice Naming Series",
+	"POS Naming series",
+	"Sales Order Naming Series",
+	"Quotation Naming Series",
+	"Purchase Order Naming Series",
+	"Purchase Receipt Naming Series",
+	"Purchase Invoice Naming Script",
+	"Material Request Branch wise",
+	"Stock Entry Naming",
+	"Item naming series",
+)
+
+
+def execute():
+	frappe.db.set_value("Server Script", {"name": ("in", NAMING_SERVER_SCRIPTS)}, "disabled", 1)
@@ -0,0 +1,8 @@
+import frappe
+
+from unicom_chemist.unicom_chemist.batch_expiry import BATCH_CACHE_KEY, BUNDLE_BATCHES_KEY, BUNDLE_CACHE_KEY
+
+
+def execute():
+	# The caches were single Redis hashes without expiry; they are now one expiring key per name
+	frappe.cache.delete_value([BUNDLE_CACHE_KEY, BATCH_CACHE_KEY, BUNDLE_BATCHES_KEY])
@@ -0,0 +1,19 @@
+import frappe
+
+
+def execute():
+	"""Move the tiers of the "Expiry based discount" server script into Expiry Discount Settings"""
+	settings = frappe.get_single("Expiry Discount Settings")
+	if settings.tiers:
+		return
+
+	settings.append("tiers", {"days_to_expiry": 60, "discount_percentage": 50})
+	settings.append("tiers", {"days_to_expiry": 90, "discount_percentage": 30})
+
+	script_enabled = frappe.db.get_value("Server Script", "Expiry based discount", "disabled") == 0
+	settings.enabled = 1 if script_enabled else 0
+	settings.save()
+
+	# The app applies the discount now, keep the script from running twice
+	if script_enabled:
+		frappe.db.set_value("Server Script", "Expiry based discount", "disabled", 1)
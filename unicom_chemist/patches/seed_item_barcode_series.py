@@ -0,0 +1,10 @@
+import frappe
+
+from unicom_chemist.unicom_chemist.barcode import seed_barcode_series
+
+
+def execute():
+	"""Seed the barcode counter from the highest barcode in use and retire the "Item Barcode" server script"""
+	seed_barcode_series()
+
+	frappe.db.set_value("Server Script", "Item Barcode", "disabled", 1)
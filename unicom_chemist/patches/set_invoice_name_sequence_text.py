@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+	"""Fill the sequence as written in the name, e.g. "07" of SI-ACC-26-07, for already indexed invoices"""
+	frappe.db.sql(
+		"""
+		UPDATE `tabInvoice Name Index`
+		SET sequence_text = SUBSTRING_INDEX(SUBSTRING_INDEX(name, '-', 4), '-', -1)
+		WHERE IFNULL(sequence_text, '') = ''
+		"""
+	)
@@ -0,0 +1,79 @@
+// Shared by the Sales and POS Invoice Report UCL
+frappe.provide("unicom_chemist.invoice_report");
+
+// "Export in Background" menu item and the notification when the file is ready
+unicom_chemist.invoice_report.setup_export = function(report) {
+    report.page.add_menu_item(__("Export in Background"), function() {
+        frappe.prompt({
+            "fieldname": "file_format",
+            "label": __("Format"),
+            "fieldtype": "Select",
+            "options": "CSV\nExcel",
+            "default": "CSV",
+            "reqd": 1
+        }, function(values) {
+            frappe.call({
+                method: "unicom_chemist.unicom_chemist.invoice_export.start_invoice_report_export",
+                args: {
+                    "report_name": report.report_name,
+                    "filters": report.get_filter_values(),
+                    "file_format": values.file_format
+                },
+                callback: function() {
+                    frappe.show_alert({
+                        message: __("Export started, you will be notified when the file is ready"),
+                        indicator: "blue"
+                    });
+                }
+            });
+        }, __("Export in Background"), __("Export"));
+    });
+    
+    frappe.realtime.off("invoice_report_export");
+    frappe.realtime.on("invoice_report_export", function(data) {
+        if (data.failed) {
+            frappe.msgprint(__("Export of {0} failed, please check the Error Log", [data.report_name]));
+            return;
+        }
+        frappe.msgprint(__("Export of {0} is ready: {1}", [
+            data.report_name,
+            `<a href="${data.file_url}" target="_blank">${data.file_name}</a>`
+        ]));
+    });
+};
+
+// Keyset paging: the cursor is the (posting_date, creation, name) of the last row shown
+unicom_chemist.invoice_report.setup_paging = function(report) {
+    report._cursors = [];
+    
+    report.page.add_inner_button(__("First Page"), function() {
+        report._cursors = [];
+        report.set_filter_value("cursor", "");
+    }, __("Pages"));
+    
+    report.page.add_inner_button(__("Previous Page"), function() {
+        report._cursors.pop();
+        report.set_filter_value("cursor", report._cursors[report._cursors.length - 1] || "");
+    }, __("Pages"));
+    
+    report.page.add_inner_button(__("Next Page"), function() {
+        let data = report.data || [];
+        let page_length = cint(report.get_filter_value("page_length")) || 500;
+        if (data.length < page_length) {
+            frappe.msgprint(__("This is the last page"));
+            return;
+        }
+        
+        let filters = report.get_filter_values();
+        delete filters.cursor;
+        delete filters.page_length;
+        
+        let last = data[data.length - 1];
+        let cursor = JSON.stringify({
+            "filters": filters,
+            "key": [last.posting_date, last.creation, last.name]
+        });
+        report._cursors.push(cursor);
+        report.set_filter_value("cursor", cursor);
+    }, __("Pages"));
+};
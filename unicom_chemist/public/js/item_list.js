@@ -0,0 +1,49 @@
+frappe.listview_settings['Item'] = frappe.listview_settings['Item'] || {};
+
+const item_list_onload = frappe.listview_settings['Item'].onload;
+
+frappe.listview_settings['Item'].onload = function(listview) {
+    if (item_list_onload) item_list_onload(listview);
+
+    listview.page.add_menu_item(__('Bulk Import Items'), function() {
+        const d = new frappe.ui.Dialog({
+            title: __('Bulk Import Items'),
+            fields: [
+                {
+                    label: __('CSV / XLSX File'),
+                    fieldname: 'file_url',
+                    fieldtype: 'Attach',
+                    reqd: 1,
+                    description: __('Columns: item_code, item_name, item_group, stock_uom, and optionally barcode and other Item fields')
+                }
+            ],
+            primary_action_label: __('Import'),
+            primary_action(values) {
+                frappe.call({
+                    method: 'unicom_chemist.unicom_chemist.item_import.start_item_import',
+                    args: { file_url: values.file_url },
+                    callback: function(r) {
+                        d.hide();
+                        frappe.show_alert({
+                            message: __('Importing {0} items in the background', [r.message.rows]),
+                            indicator: 'blue'
+                        });
+                    }
+                });
+            }
+        });
+        d.show();
+    });
+
+    frappe.realtime.off('item_import_progress');
+    frappe.realtime.on('item_import_progress', function(data) {
+        if (data.done) {
+            frappe.hide_progress();
+            frappe.msgprint(__('Item import finished: {0} imported, {1} failed (see Error Log)', [data.imported, data.failed]));
+            listview.refresh();
+        } else {
+            frappe.show_progress(__('Importing Items'), data.processed, data.total,
+                __('{0} imported, {1} failed', [data.imported, data.failed]));
+        }
+    });
+};
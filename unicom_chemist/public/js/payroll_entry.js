@@ -0,0 +1,25 @@
+// Progress of the parallel chunk jobs of a Bulk Payroll Mode run
+frappe.ui.form.on('Payroll Entry', {
+    onload: function(frm) {
+        frappe.realtime.off('unicom_chemist_payroll_progress');
+        frappe.realtime.on('unicom_chemist_payroll_progress', function(data) {
+            if (data.payroll_entry !== frm.doc.name) return;
+
+            const title = data.action === 'create' ? __('Creating Salary Slips') : __('Submitting Salary Slips');
+            frappe.show_progress(
+                title,
+                data.finished,
+                data.chunks,
+                __('{0} of {1} jobs done', [data.finished, data.chunks]),
+                true
+            );
+
+            if (data.failed.length) {
+                frappe.show_alert({
+                    message: __('Failed for {0}', [data.failed.join(', ')]),
+                    indicator: 'red'
+                });
+            }
+        });
+    }
+});
@@ -0,0 +1,74 @@
+// Bundle changes arriving within this window are resolved with one server call
+var BATCH_EXPIRY_FETCH_DELAY = 150;
+
+frappe.ui.form.on('Sales Invoice Item', {
+    serial_and_batch_bundle: function(frm, cdt, cdn) {
+        var row = locals[cdt][cdn];
+
+        if (!row.serial_and_batch_bundle) {
+            // Clear the expiry date if bundle is removed
+            frappe.model.set_value(cdt, cdn, 'custom_bundle_expiry_date', '');
+            return;
+        }
+
+        queue_batch_expiry_fetch(frm, cdt, cdn);
+    }
+});
+
+function queue_batch_expiry_fetch(frm, cdt, cdn) {
+    frm._pending_expiry_rows = frm._pending_expiry_rows || {};
+    frm._pending_expiry_rows[cdn] = cdt;
+
+    clearTimeout(frm._expiry_fetch_timeout);
+    frm._expiry_fetch_timeout = setTimeout(() => fetch_pending_batch_expiry(frm), BATCH_EXPIRY_FETCH_DELAY);
+}
+
+function fetch_pending_batch_expiry(frm) {
+    const pending = frm._pending_expiry_rows || {};
+    frm._pending_expiry_rows = {};
+
+    const rows = Object.keys(pending)
+        .map(cdn => locals[pending[cdn]] && locals[pending[cdn]][cdn])
+        .filter(row => row && row.serial_and_batch_bundle);
+
+    if (!rows.length) return;
+
+    const bundle_names = [...new Set(rows.map(row => row.serial_and_batch_bundle))];
+
+    frappe.call({
+        method: 'unicom_chemist.unicom_chemist.sales_invoice.get_batch_expiry_for_bundles',
+        args: {
+            bundle_names: bundle_names
+        },
+        callback: function(r) {
+            const expiry_map = r.message || {};
+            let missing = 0;
+
+            rows.forEach(row => {
+                // Skip rows whose bundle changed again while the call was in flight
+                if (!bundle_names.includes(row.serial_and_batch_bundle)) return;
+
+                const expiry_date = expiry_map[row.serial_and_batch_bundle] || '';
+                if (!expiry_date) missing++;
+
+                if ((row.custom_bundle_expiry_date || '') !== expiry_date) {
+                    frappe.model.set_value(row.doctype, row.name, 'custom_bundle_expiry_date', expiry_date);
+                }
+            });
+
+            if (missing) {
+                frappe.show_alert({
+                    message: __('No batch expiry found for {0} row(s)', [missing]),
+                    indicator: 'orange'
+                });
+            }
+        },
+        error: function(r) {
+            frappe.show_alert({
+                message: __('Failed to fetch batch expiry date'),
+                indicator: 'red'
+            });
+        }
+    });
+}
+
@@ -0,0 +1,87 @@
+"""6-digit item barcodes handed out from a locked counter row in `tabSeries`.
+
+Replaces the "Item Barcode" server script, which scanned `tabItem Barcode`
+for the highest barcode on every insert. The counter is seeded from that
+maximum on install, by the seed_item_barcode_series patch, or by the first
+allocation if the row is missing.
+"""
+
+import frappe
+from frappe import _
+
+
+BARCODE_SERIES = "UCL-ITEM-BARCODE-"
+BARCODE_LENGTH = 6
+FIRST_BARCODE = 100000
+
+
+def get_current_barcode_number():
+    """Highest 6-digit numeric barcode in use, for seeding the counter"""
+    return frappe.db.sql(
+        """
+        SELECT MAX(CAST(barcode AS UNSIGNED))
+        FROM `tabItem Barcode`
+        WHERE barcode REGEXP '^[0-9]{6}$'
+        """
+    )[0][0] or FIRST_BARCODE - 1
+
+
+def seed_barcode_series():
+    """Create the counter row from the highest barcode in use; a no-op when it exists.
+
+    A concurrent seed of the same row waits on its key and then leaves the
+    first one's value in place, so it cannot fail with a duplicate entry.
+    """
+    frappe.db.sql(
+        """
+        INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE `name` = `name`
+        """,
+        (BARCODE_SERIES, get_current_barcode_number()),
+    )
+
+
+def lock_barcode_series():
+    """Current value of the counter, locked until the transaction ends; None without the row"""
+    current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", BARCODE_SERIES)
+    return current[0][0] if current else None
+
+
+def allocate_barcodes(count=1):
+    """Reserve `count` barcodes in one go.
+
+    The counter row is locked until the transaction ends, so concurrent
+    inserts get distinct, mostly contiguous blocks. Numbers already used by
+    manually entered barcodes are skipped.
+    """
+    current = lock_barcode_series()
+    if current is None:
+        seed_barcode_series()
+        current = lock_barcode_series()
+
+    barcodes = []
+    while len(barcodes) < count:
+        block = [str(number).zfill(BARCODE_LENGTH) for number in range(current + 1, current + 1 + count - len(barcodes))]
+        current += len(block)
+
+        taken = set(frappe.get_all("Item Barcode", filters={"barcode": ("in", block)}, pluck="barcode"))
+        barcodes.extend(barcode for barcode in block if barcode not in taken)
+
+    frappe.db.sql("UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s", (current, BARCODE_SERIES))
+    return barcodes
+
+
+def allocate_barcode():
+    return allocate_barcodes(1)[0]
+
+
+def set_item_barcode(doc, method=None):
+    """doc_events After Insert handler for Item: link the next barcode without saving the Item again"""
+    if doc.barcodes:
+        return
+
+    barcode = allocate_barcode()
+    doc.append("barcodes", {"barcode": barcode, "uom": doc.stock_uom}).db_insert()
+
+    if not (frappe.flags.in_import or doc.flags.in_import):
+        frappe.msgprint(_("Barcode {0} has been created and linked to this item.").format(barcode))
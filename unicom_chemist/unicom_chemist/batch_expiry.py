@@ -0,0 +1,238 @@
+import pickle
+from collections import OrderedDict
+from functools import partial
+
+import frappe
+
+
+BUNDLE_CACHE_KEY = "unicom_chemist:bundle_expiry"
+BATCH_CACHE_KEY = "unicom_chemist:batch_expiry"
+BUNDLE_BATCHES_KEY = "unicom_chemist:bundle_batches"
+GENERATION_KEY = "unicom_chemist:batch_expiry_generation"
+
+# Every bundle and batch is its own Redis key, dropped after this many seconds unless invalidated
+# earlier; bundles are unique per invoice line, so nothing may be kept without expiry
+CACHE_TTL = 24 * 60 * 60
+
+# Size of the in-process LRU kept in front of Redis, per worker
+LOCAL_CACHE_SIZE = 4096
+
+# Stored for bundles / batches that have no expiry so misses are cached too
+_NO_EXPIRY = ""
+
+_local_cache = OrderedDict()
+_local_generation = {}
+_stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+
+def get_batch_expiry_map(bundle_names):
+    """Return {bundle_name: custom_batch_expiry} for the given Serial and Batch Bundles.
+
+    Lookups go through the in-process LRU, then the site's Redis cache, and
+    only the remaining bundles are read from `tabSerial and Batch Entry` in
+    one query. As before, the expiry of a bundle is the one on its first entry
+    (lowest idx). Bundles without an expiry are left out of the result.
+    """
+    return _get_cached(BUNDLE_CACHE_KEY, bundle_names, _query_bundle_expiry)
+
+
+def get_batch_expiry_dates(batch_nos):
+    """Return {batch_no: expiry_date} for the given Batches, cached like bundles."""
+    return _get_cached(BATCH_CACHE_KEY, batch_nos, _query_batch_expiry)
+
+
+def get_bundle_batches(bundle_names):
+    """Return {bundle_name: [batch_no]} for the given bundles, in entry order, cached like bundles."""
+    return _get_cached(BUNDLE_BATCHES_KEY, bundle_names, _query_bundle_batches)
+
+
+def _query_bundle_expiry(bundle_names):
+    entries = frappe.db.sql(
+        """
+        SELECT parent, custom_batch_expiry
+        FROM `tabSerial and Batch Entry`
+        WHERE parenttype = 'Serial and Batch Bundle'
+        AND parent IN %(bundles)s
+        ORDER BY parent, idx
+        """,
+        {"bundles": tuple(bundle_names)},
+        as_dict=True,
+    )
+
+    expiry_map = {}
+    for entry in entries:
+        expiry_map.setdefault(entry.parent, entry.custom_batch_expiry)
+
+    return expiry_map
+
+
+def _query_bundle_batches(bundle_names):
+    entries = frappe.db.sql(
+        """
+        SELECT parent, batch_no
+        FROM `tabSerial and Batch Entry`
+        WHERE parenttype = 'Serial and Batch Bundle'
+        AND parent IN %(bundles)s
+        AND IFNULL(batch_no, '') != ''
+        ORDER BY parent, idx
+        """,
+        {"bundles": tuple(bundle_names)},
+    )
+
+    bundle_batches = {}
+    for bundle, batch_no in entries:
+        bundle_batches.setdefault(bundle, []).append(batch_no)
+
+    return bundle_batches
+
+
+def _query_batch_expiry(batch_nos):
+    return dict(
+        frappe.db.sql(
+            """
+            SELECT name, expiry_date
+            FROM `tabBatch`
+            WHERE name IN %(batches)s
+            """,
+            {"batches": tuple(batch_nos)},
+        )
+    )
+
+
+def _get_cached(cache_key, names, query):
+    names = {name for name in names if name}
+    if not names:
+        return {}
+
+    _sync_local_generation()
+    site = frappe.local.site
+    found = {}
+
+    missing = []
+    for name in names:
+        local_key = (site, cache_key, name)
+        if local_key in _local_cache:
+            _local_cache.move_to_end(local_key)
+            found[name] = _local_cache[local_key]
+            _stats["local_hits"] += 1
+        else:
+            missing.append(name)
+
+    if missing:
+        for name, value in zip(missing, _redis_mget(cache_key, missing)):
+            if value is not None:
+                found[name] = value
+                _set_local((site, cache_key, name), value)
+                _stats["redis_hits"] += 1
+
+        missing = [name for name in missing if name not in found]
+
+    if missing:
+        _stats["misses"] += len(missing)
+        fetched = query(missing)
+        pipeline = frappe.cache.pipeline()
+        for name in missing:
+            value = fetched.get(name) or _NO_EXPIRY
+            found[name] = value
+            pipeline.set(_redis_key(cache_key, name), pickle.dumps(value), ex=CACHE_TTL)
+            _set_local((site, cache_key, name), value)
+        pipeline.execute()
+
+    return {name: value for name, value in found.items() if value != _NO_EXPIRY}
+
+
+def _redis_key(cache_key, name):
+    return frappe.cache.make_key(f"{cache_key}:{name}")
+
+
+def _redis_mget(cache_key, names):
+    """Fetch the values of several names in one round trip."""
+    try:
+        values = frappe.cache.mget([_redis_key(cache_key, name) for name in names])
+    except Exception:
+        return [None] * len(names)
+
+    return [pickle.loads(value) if value is not None else None for value in values]
+
+
+def _set_local(local_key, value):
+    _local_cache[local_key] = value
+    _local_cache.move_to_end(local_key)
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+
+def _sync_local_generation():
+    """Drop this worker's LRU entries for the site if another worker invalidated them."""
+    site = frappe.local.site
+    generation = frappe.cache.get_value(GENERATION_KEY)
+    if _local_generation.get(site) != generation:
+        _clear_local(site)
+        _local_generation[site] = generation
+
+
+def _clear_local(site):
+    for local_key in [key for key in _local_cache if key[0] == site]:
+        del _local_cache[local_key]
+
+
+def _bump_generation():
+    frappe.cache.set_value(GENERATION_KEY, frappe.generate_hash(length=10))
+    _clear_local(frappe.local.site)
+
+
+def invalidate_bundles(bundle_names):
+    _invalidate_after_commit((BUNDLE_CACHE_KEY, BUNDLE_BATCHES_KEY), bundle_names)
+
+
+def invalidate_batches(batch_nos):
+    _invalidate_after_commit((BATCH_CACHE_KEY,), batch_nos)
+
+
+def _invalidate_after_commit(cache_keys, names):
+    """Drop the names from the cache once the current transaction is committed.
+
+    Dropped before the commit, another worker could cache the rows it still
+    reads from before the change again, and keep them under the new generation.
+    """
+    names = [name for name in names if name]
+    if names:
+        frappe.db.after_commit.add(partial(_invalidate, cache_keys, names))
+
+
+def _invalidate(cache_keys, names):
+    frappe.cache.delete_value(
+        [_redis_key(cache_key, name) for cache_key in cache_keys for name in names], make_keys=False
+    )
+    _bump_generation()
+
+
+def clear_cache():
+    for cache_key in (BUNDLE_CACHE_KEY, BATCH_CACHE_KEY, BUNDLE_BATCHES_KEY):
+        frappe.cache.delete_keys(f"{cache_key}:")
+    _bump_generation()
+
+
+def on_bundle_change(doc, method=None):
+    """doc_events handler for Serial and Batch Bundle"""
+    invalidate_bundles([doc.name])
+    invalidate_batches(entry.batch_no for entry in doc.get("entries") or [])
+
+
+def on_batch_change(doc, method=None):
+    """doc_events handler for Batch"""
+    invalidate_batches([doc.name])
+
+
+@frappe.whitelist()
+def get_cache_stats():
+    """Hit/miss counters of the batch expiry cache for this worker"""
+    frappe.only_for("System Manager")
+
+    lookups = sum(_stats.values())
+    return {
+        **_stats,
+        "lookups": lookups,
+        "hit_ratio": round((lookups - _stats["misses"]) / lookups, 4) if lookups else 0,
+        "local_entries": len(_local_cache),
+    }
@@ -0,0 +1,219 @@
+"""Data of the Batch Expiry Dashboard workspace block.
+
+Batch quantities per warehouse are summed from the stock ledger in SQL
+(Serial and Batch Bundle entries, plus legacy Stock Ledger Entry rows with a
+batch_no) and joined with the nightly Batch Expiry Status and Item, so the
+browser gets the bucket counts and one sorted page instead of every Batch and
+one get_batch_qty call per batch. The status table already holds each
+batch's tier and days to expiry; only custom thresholds re-bucket its days.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from unicom_chemist.unicom_chemist.dashboard_cache import get_cached_payload
+from unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status import (
+    EXPIRED,
+    EXPIRY_TIERS,
+)
+
+
+DEFAULT_PAGE_LENGTH = 100
+MAX_PAGE_LENGTH = 1000
+
+# Sort option: column(s) of the detail query
+SORT_FIELDS = {
+    "expiry_date": "expiry_date",
+    "item_code": "item_code",
+    "item_name": "item_name",
+    "batch_no": "batch_no",
+    "warehouse": "warehouse",
+    "qty": "warehouse_qty",
+}
+
+STATUSES = (EXPIRED, *(tier for tier, min_days in reversed(EXPIRY_TIERS)))
+
+
+@frappe.whitelist()
+def get_batch_expiry_dashboard(
+    item=None,
+    warehouse=None,
+    status=None,
+    use_immediately=None,
+    near_expiry=None,
+    sort_by="expiry_date",
+    sort_order="asc",
+    page=1,
+    page_length=DEFAULT_PAGE_LENGTH,
+):
+    """{"counts": {status: batches}, "total": rows, "items": [rows of the page]}.
+
+    Only batches with stock are included. A row is a batch in one warehouse;
+    counts are distinct batches per status. `use_immediately` and
+    `near_expiry` override the day thresholds of those buckets.
+    """
+    if not frappe.has_permission("Batch", "read"):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    # The unfiltered first page is what the dashboard opens with, it is precomputed
+    thresholds = dict(EXPIRY_TIERS)
+    if (
+        not (item or warehouse or status)
+        and cint(use_immediately) in (0, thresholds["Near Expiry"])
+        and cint(near_expiry) in (0, thresholds["Healthy"])
+        and sort_by == "expiry_date"
+        and sort_order == "asc"
+        and cint(page) <= 1
+        and cint(page_length) == DEFAULT_PAGE_LENGTH
+    ):
+        return get_cached_payload("batch_expiry")
+
+    return build_batch_expiry_data(
+        item, warehouse, status, use_immediately, near_expiry, sort_by, sort_order, page, page_length
+    )
+
+
+def build_batch_expiry_data(
+    item=None,
+    warehouse=None,
+    status=None,
+    use_immediately=None,
+    near_expiry=None,
+    sort_by="expiry_date",
+    sort_order="asc",
+    page=1,
+    page_length=DEFAULT_PAGE_LENGTH,
+):
+    if status and status not in STATUSES:
+        frappe.throw(_("Unknown status: {0}").format(status))
+
+    if sort_by not in SORT_FIELDS:
+        frappe.throw(_("Cannot sort by {0}").format(sort_by))
+
+    counts_query, page_query, params = get_queries(
+        item, warehouse, status, use_immediately, near_expiry, sort_by, sort_order, page, page_length
+    )
+    counts = dict(frappe.db.sql(counts_query, params))
+    items = frappe.db.sql(page_query, params, as_dict=1)
+
+    total = items[0].total_rows if items else 0
+    for row in items:
+        del row["total_rows"]
+
+    return {
+        "counts": {status: counts.get(status, 0) for status in STATUSES},
+        "total": total,
+        "items": items,
+    }
+
+
+def get_queries(
+    item=None,
+    warehouse=None,
+    status=None,
+    use_immediately=None,
+    near_expiry=None,
+    sort_by="expiry_date",
+    sort_order="asc",
+    page=1,
+    page_length=DEFAULT_PAGE_LENGTH,
+):
+    """(counts query, page query, params) of the dashboard for the filters"""
+    # Tier: lowest days to expiry in it; the dashboard's thresholds are the upper bounds below
+    thresholds = dict(EXPIRY_TIERS)
+    if cint(use_immediately):
+        thresholds["Near Expiry"] = cint(use_immediately)
+    if cint(near_expiry):
+        thresholds["Healthy"] = cint(near_expiry)
+
+    page_length = min(cint(page_length) or DEFAULT_PAGE_LENGTH, MAX_PAGE_LENGTH)
+    params = {
+        "item": item,
+        "warehouse": warehouse,
+        "status": status,
+        "near_expiry_days": thresholds["Near Expiry"],
+        "healthy_days": thresholds["Healthy"],
+        "page_length": page_length,
+        "offset": (max(cint(page), 1) - 1) * page_length,
+    }
+    rows_query = get_rows_query(item, warehouse, custom_thresholds=thresholds != dict(EXPIRY_TIERS))
+
+    counts_query = f"""
+        SELECT status, COUNT(DISTINCT batch_no)
+        FROM ({rows_query}) expiry_rows
+        GROUP BY status
+    """
+    page_query = f"""
+        SELECT *, COUNT(*) OVER () AS total_rows
+        FROM ({rows_query}) expiry_rows
+        {"WHERE status = %(status)s" if status else ""}
+        ORDER BY {SORT_FIELDS[sort_by]} {"DESC" if sort_order == "desc" else "ASC"}, batch_no, warehouse
+        LIMIT %(page_length)s OFFSET %(offset)s
+    """
+    return counts_query, page_query, params
+
+
+def get_rows_query(item, warehouse, custom_thresholds=False):
+    """Batch stock per warehouse with expiry status, for the item and warehouse filters"""
+    bundle_conditions = ["sbb.docstatus = 1", "sbb.is_cancelled = 0", "sbe.batch_no IS NOT NULL"]
+    ledger_conditions = [
+        "sle.is_cancelled = 0",
+        "sle.batch_no IS NOT NULL",
+        "sle.batch_no != ''",
+        "IFNULL(sle.serial_and_batch_bundle, '') = ''",
+    ]
+    if item:
+        bundle_conditions.append("sbb.item_code = %(item)s")
+        ledger_conditions.append("sle.item_code = %(item)s")
+    if warehouse:
+        bundle_conditions.append("sbb.warehouse = %(warehouse)s")
+        ledger_conditions.append("sle.warehouse = %(warehouse)s")
+
+    status = "bes.expiry_tier"
+    if custom_thresholds:
+        status = f"""
+            CASE
+                WHEN bes.days_to_expiry < 0 THEN '{EXPIRED}'
+                WHEN bes.days_to_expiry < %(near_expiry_days)s THEN 'Use Immediately'
+                WHEN bes.days_to_expiry < %(healthy_days)s THEN 'Near Expiry'
+                ELSE 'Healthy'
+            END
+        """
+
+    return f"""
+        SELECT
+            stock.batch_no,
+            bes.item_code,
+            item.item_name,
+            item.stock_uom,
+            stock.warehouse,
+            stock.qty AS warehouse_qty,
+            SUM(stock.qty) OVER (PARTITION BY stock.batch_no) AS total_available_qty,
+            bes.expiry_date,
+            bes.expiry_date AS expires_on,
+            bes.days_to_expiry AS expiry_in_days,
+            {status} AS status
+        FROM (
+            SELECT batch_no, warehouse, SUM(qty) AS qty
+            FROM (
+                SELECT sbe.batch_no, sbb.warehouse, sbe.qty
+                FROM `tabSerial and Batch Entry` sbe
+                INNER JOIN `tabSerial and Batch Bundle` sbb ON sbb.name = sbe.parent
+                WHERE {" AND ".join(bundle_conditions)}
+                UNION ALL
+                SELECT sle.batch_no, sle.warehouse, sle.actual_qty
+                FROM `tabStock Ledger Entry` sle
+                WHERE {" AND ".join(ledger_conditions)}
+            ) ledger
+            GROUP BY batch_no, warehouse
+            HAVING qty > 0
+        ) stock
+        INNER JOIN `tabBatch Expiry Status` bes ON bes.name = stock.batch_no
+        INNER JOIN `tabItem` item ON item.name = bes.item_code
+    """
+
+
+def get_slices():
+    # Only the default view is precomputed
+    return [()]
@@ -0,0 +1,50 @@
+from functools import partial
+
+import frappe
+
+
+# (site, key) -> (generation, value)
+_maps = {}
+
+
+def get_cached_map(key, loader):
+    """Return a small lookup map kept in process memory across requests.
+
+    The map is rebuilt with `loader()` when it is first needed in this worker or
+    after `invalidate_cached_map` was called for it by any worker. Checking that
+    costs one Redis read per request; repeated calls in a request are free.
+    """
+    site = frappe.local.site
+    generation_key = f"{key}:generation"
+
+    generation = frappe.cache.get_value(generation_key)
+    if generation is None:
+        generation = frappe.generate_hash(length=10)
+        frappe.cache.set_value(generation_key, generation)
+
+    cached = _maps.get((site, key))
+    if cached and cached[0] == generation:
+        return cached[1]
+
+    value = loader()
+    _maps[(site, key)] = (generation, value)
+    return value
+
+
+def invalidate_cached_map(key):
+    """Rebuild the map on every worker once the current transaction is committed.
+
+    Invalidated before the commit, another worker could reload the rows it still
+    reads from before the change and keep them under the new generation. This
+    worker drops its copy right away, so the rest of the transaction sees its
+    own change, and again on rollback so it does not keep what was undone.
+    """
+    drop_local = partial(_maps.pop, (frappe.local.site, key), None)
+    drop_local()
+    frappe.db.after_commit.add(partial(_new_generation, key))
+    frappe.db.after_rollback.add(drop_local)
+
+
+def _new_generation(key):
+    frappe.cache.set_value(f"{key}:generation", frappe.generate_hash(length=10))
+    _maps.pop((frappe.local.site, key), None)
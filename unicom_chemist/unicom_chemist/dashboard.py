@@ -0,0 +1,335 @@
+"""Data of the Unicom Dashboard workspace block, aggregated in SQL.
+
+`get_dashboard_data` returns the KPI cards and chart series for a period
+and branch in one response, so the browser no longer pulls invoice, bin
+and item lists to total them itself. Sales figures come from the Branch
+Sales Rollup; the rest are grouped queries on indexed columns. Both
+sections are served from dashboard_cache.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, date_diff, flt, get_first_day, getdate, today
+
+from unicom_chemist.unicom_chemist.dashboard_cache import get_cached_payload
+
+
+# period: months covered up to today, as in the dashboard's period selector
+PERIODS = {
+    "daily": 0,
+    "monthly": 1,
+    "quarterly": 3,
+    "yearly": 12,
+}
+
+SECTIONS = ("kpis", "charts")
+
+# Months shown by the Sales Performance chart, the current one included
+SALES_PERFORMANCE_MONTHS = 6
+
+MONTH_LABELS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@frappe.whitelist()
+def get_dashboard_data(period="monthly", branch=None, sections=None):
+    """{"kpis": {card: {"value", "growth"}}, "charts": {...}} for the period and branch"""
+    if not frappe.has_permission("Sales Invoice", "report"):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    if period not in PERIODS:
+        frappe.throw(_("Unknown period: {0}").format(period))
+
+    sections = frappe.parse_json(sections) if sections else SECTIONS
+    return build_dashboard_data(period, branch or None, sections)
+
+
+def build_dashboard_data(period, branch, sections=SECTIONS):
+    from_date, to_date = get_period(period)
+    data = {"from_date": from_date, "to_date": to_date, "branch": branch}
+
+    if "kpis" in sections:
+        data["kpis"] = get_cached_payload("unicom_kpis", period, branch)
+    if "charts" in sections:
+        data["charts"] = get_cached_payload("unicom_charts", branch)
+
+    return data
+
+
+def build_kpis(period, branch):
+    return get_kpis(*get_period(period), branch)
+
+
+def build_charts(branch):
+    return {
+        "sales_performance": get_sales_performance(branch),
+        "sales_trends": get_sales_trends(branch),
+    }
+
+
+def get_branches():
+    """None (all branches) followed by every Branch"""
+    return [None, *frappe.get_all("Branch", pluck="name")]
+
+
+def get_kpi_slices():
+    return [(period, branch) for branch in get_branches() for period in PERIODS]
+
+
+def get_chart_slices():
+    return [(branch,) for branch in get_branches()]
+
+
+def get_period(period, on_date=None):
+    to_date = getdate(on_date or today())
+    return add_months(to_date, -PERIODS[period]), to_date
+
+
+def get_previous_period(from_date, to_date):
+    """The period of the same length ending the day before `from_date`"""
+    return add_days(from_date, -date_diff(to_date, from_date) - 1), add_days(from_date, -1)
+
+
+def get_growth(current, previous):
+    if not previous:
+        return 0
+
+    return round((flt(current) - flt(previous)) / flt(previous) * 100, 1)
+
+
+def get_kpis(from_date, to_date, branch):
+    previous_from, previous_to = get_previous_period(from_date, to_date)
+
+    current = get_period_totals(from_date, to_date, branch)
+    previous = get_period_totals(previous_from, previous_to, branch)
+    fast_moving, slow_moving = get_item_movement(from_date, to_date, branch)
+    movement_counts = get_movement_counts(branch)
+
+    kpis = {
+        key: {"value": flt(current[key], 2), "growth": get_growth(current[key], previous[key])}
+        for key in current
+    }
+    kpis.update(
+        {
+            # Stock on hand and suppliers have no history to compare with
+            "inventory": {"value": get_items_in_stock(branch), "growth": 0},
+            "suppliers": {"value": frappe.db.count("Supplier", {"disabled": 0}), "growth": 0},
+            # Item counts are of the nightly classification, not of the period
+            "fast_moving": {
+                "value": fast_moving or _("No Data"),
+                "growth": 0,
+                "items": movement_counts.get("Fast", 0),
+            },
+            "slow_moving": {
+                "value": slow_moving or _("No Data"),
+                "growth": 0,
+                "items": movement_counts.get("Slow", 0),
+            },
+            "non_moving": {"value": movement_counts.get("Non-Moving", 0), "growth": 0},
+        }
+    )
+    return kpis
+
+
+def get_period_totals(from_date, to_date, branch):
+    sales = frappe.db.sql(*get_rollup_totals_query(from_date, to_date, branch), as_dict=1)[0]
+    customers = frappe.db.sql(*get_customer_count_query(from_date, to_date, branch))[0][0]
+    purchase_revenue = frappe.db.sql(*get_purchase_revenue_query(from_date, to_date, branch))[0][0]
+
+    opportunities = frappe.db.count(
+        "Opportunity", {"status": "Converted", "transaction_date": ("between", (from_date, to_date))}
+    )
+
+    return {
+        "prescriptions": sales.prescriptions,
+        "sales": sales.sales,
+        "sales_outstanding": sales.sales_outstanding,
+        "customers": customers,
+        "purchase_revenue": purchase_revenue,
+        "opportunities": opportunities,
+    }
+
+
+def get_rollup_totals_query(from_date, to_date, branch):
+    return (
+        f"""
+        SELECT
+            IFNULL(SUM(invoice_count), 0) AS prescriptions,
+            IFNULL(SUM(grand_total), 0) AS sales,
+            IFNULL(SUM(outstanding_amount), 0) AS sales_outstanding
+        FROM `tabBranch Sales Rollup`
+        WHERE posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND branch = %(branch)s" if branch else ""}
+        """,
+        {"from_date": from_date, "to_date": to_date, "branch": branch},
+    )
+
+
+def get_customer_count_query(from_date, to_date, branch):
+    return (
+        f"""
+        SELECT COUNT(DISTINCT customer)
+        FROM `tabSales Invoice`
+        WHERE docstatus = 1
+        AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND branch = %(branch)s" if branch else ""}
+        """,
+        {"from_date": from_date, "to_date": to_date, "branch": branch},
+    )
+
+
+def get_purchase_revenue_query(from_date, to_date, branch):
+    return (
+        f"""
+        SELECT IFNULL(SUM(grand_total), 0)
+        FROM `tabPurchase Invoice`
+        WHERE docstatus = 1
+        AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND branch = %(branch)s" if branch else ""}
+        """,
+        {"from_date": from_date, "to_date": to_date, "branch": branch},
+    )
+
+
+def get_items_in_stock(branch):
+    """Distinct items with stock, in the warehouses of the branch when given"""
+    return frappe.db.sql(*get_items_in_stock_query(branch))[0][0]
+
+
+def get_items_in_stock_query(branch):
+    if branch:
+        return (
+            """
+            SELECT COUNT(DISTINCT bin.item_code)
+            FROM `tabBin` bin
+            INNER JOIN `tabWarehouse` wh ON wh.name = bin.warehouse
+            WHERE bin.actual_qty > 0
+            AND wh.custom_branch = %(branch)s
+            """,
+            {"branch": branch},
+        )
+
+    return "SELECT COUNT(DISTINCT item_code) FROM `tabBin` WHERE actual_qty > 0", {}
+
+
+def get_item_movement(from_date, to_date, branch):
+    """(fastest, slowest) moving item name on paid invoices; score is invoice lines times quantity sold"""
+    fastest = frappe.db.sql(*get_item_movement_query(from_date, to_date, branch, "DESC"))
+    slowest = frappe.db.sql(*get_item_movement_query(from_date, to_date, branch, "ASC"))
+    return (fastest[0][0] if fastest else None), (slowest[0][0] if slowest else None)
+
+
+def get_item_movement_query(from_date, to_date, branch, order):
+    return (
+        f"""
+        SELECT MAX(sii.item_name) AS item_name, COUNT(*) * SUM(sii.qty) AS score
+        FROM `tabSales Invoice Item` sii
+        INNER JOIN `tabSales Invoice` si ON si.name = sii.parent
+        WHERE si.docstatus = 1
+        AND si.status = 'Paid'
+        AND si.posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND si.branch = %(branch)s" if branch else ""}
+        GROUP BY sii.item_code
+        HAVING score > 0
+        ORDER BY score {order}
+        LIMIT 1
+        """,
+        {"from_date": from_date, "to_date": to_date, "branch": branch},
+    )
+
+
+def get_movement_counts(branch):
+    """Items per movement class of the nightly Item Movement Class job, in the branch when given"""
+    return dict(frappe.db.sql(*get_movement_counts_query(branch)))
+
+
+def get_movement_counts_query(branch):
+    if branch:
+        return (
+            """
+            SELECT movement, COUNT(*)
+            FROM `tabItem Movement Class`
+            WHERE branch = %(branch)s
+            GROUP BY movement
+            """,
+            {"branch": branch},
+        )
+
+    return (
+        """
+        SELECT custom_abc_category, COUNT(*)
+        FROM `tabItem`
+        WHERE custom_abc_category != ''
+        GROUP BY custom_abc_category
+        """,
+        {},
+    )
+
+
+def get_sales_performance(branch):
+    """Revenue, invoice count and quantity per month for the last months, the current one included"""
+    month_starts = get_sales_performance_months()
+    totals = {row.month: row for row in frappe.db.sql(*get_sales_performance_query(branch), as_dict=1)}
+
+    keys = [month_start.strftime("%Y-%m") for month_start in month_starts]
+    return {
+        "labels": [f"{MONTH_LABELS[month_start.month - 1]} {month_start.year}" for month_start in month_starts],
+        "revenue": [flt((totals.get(key) or {}).get("revenue"), 0) for key in keys],
+        "invoice_count": [(totals.get(key) or {}).get("invoice_count") or 0 for key in keys],
+        "quantity": [flt((totals.get(key) or {}).get("quantity")) for key in keys],
+    }
+
+
+def get_sales_performance_months():
+    return [
+        get_first_day(add_months(today(), -offset)) for offset in reversed(range(SALES_PERFORMANCE_MONTHS))
+    ]
+
+
+def get_sales_performance_query(branch):
+    return (
+        f"""
+        SELECT
+            DATE_FORMAT(posting_date, '%%Y-%%m') AS month,
+            SUM(grand_total) AS revenue,
+            SUM(invoice_count) AS invoice_count,
+            SUM(total_qty) AS quantity
+        FROM `tabBranch Sales Rollup`
+        WHERE posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND branch = %(branch)s" if branch else ""}
+        GROUP BY month
+        """,
+        {"from_date": get_sales_performance_months()[0], "to_date": today(), "branch": branch},
+    )
+
+
+def get_sales_trends(branch):
+    """Paid invoices, revenue and distinct customers per month of the current year"""
+    totals = {row.month: row for row in frappe.db.sql(*get_sales_trends_query(branch), as_dict=1)}
+
+    months = range(1, 13)
+    return {
+        "labels": list(MONTH_LABELS),
+        "invoice_count": [(totals.get(month) or {}).get("invoice_count") or 0 for month in months],
+        "revenue": [flt((totals.get(month) or {}).get("revenue"), 0) for month in months],
+        "customers": [(totals.get(month) or {}).get("customers") or 0 for month in months],
+    }
+
+
+def get_sales_trends_query(branch):
+    year = getdate(today()).year
+    return (
+        f"""
+        SELECT
+            MONTH(posting_date) AS month,
+            COUNT(*) AS invoice_count,
+            SUM(grand_total) AS revenue,
+            COUNT(DISTINCT customer) AS customers
+        FROM `tabSales Invoice`
+        WHERE docstatus = 1
+        AND status = 'Paid'
+        AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+        {"AND branch = %(branch)s" if branch else ""}
+        GROUP BY month
+        """,
+        {"from_date": f"{year}-01-01", "to_date": f"{year}-12-31", "branch": branch},
+    )
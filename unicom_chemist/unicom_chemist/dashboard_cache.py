@@ -0,0 +1,156 @@
+"""Precomputed payloads of the dashboard workspace blocks, cached in Redis.
+
+Every payload is split into slices (e.g. one per period and branch).
+Documents that change a dashboard only mark the slices of their branch dirty;
+a cron job on the long queue rebuilds the dirty slices and those about to
+expire, so a burst of stock transactions costs one rebuild. After a rebuild
+`DASHBOARD_UPDATED_EVENT` is published, so open dashboards reload the cached
+payload instead of querying the database themselves.
+"""
+
+from functools import partial
+
+import frappe
+
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+CACHE_KEY = "unicom_chemist:dashboard"
+CACHE_TTL = 60 * 60
+
+# Slices expiring within this many seconds are rebuilt by the cron job, which runs every 15 minutes
+REFRESH_MARGIN = 20 * 60
+
+# Redis set per payload of the dirty branches, ALL_BRANCHES marks every slice
+DIRTY_KEY = f"{CACHE_KEY}:dirty"
+ALL_BRANCHES = "*"
+
+PRECOMPUTE_TIMEOUT = 30 * 60
+
+DASHBOARD_UPDATED_EVENT = "unicom_chemist_dashboard_updated"
+
+# payload: (builder, slices); a slice is the builder's arguments, the branch (if any) last
+PAYLOADS = {
+    "unicom_kpis": (
+        "unicom_chemist.unicom_chemist.dashboard.build_kpis",
+        "unicom_chemist.unicom_chemist.dashboard.get_kpi_slices",
+    ),
+    "unicom_charts": (
+        "unicom_chemist.unicom_chemist.dashboard.build_charts",
+        "unicom_chemist.unicom_chemist.dashboard.get_chart_slices",
+    ),
+    "batch_expiry": (
+        "unicom_chemist.unicom_chemist.batch_expiry_dashboard.build_batch_expiry_data",
+        "unicom_chemist.unicom_chemist.batch_expiry_dashboard.get_slices",
+    ),
+}
+
+
+def get_cache_key(payload, args):
+    return ":".join((CACHE_KEY, payload, *(str(arg or "") for arg in args)))
+
+
+def get_cached_payload(payload, *args):
+    """The cached slice, built now if the cache does not have it"""
+    cached = frappe.cache.get_value(get_cache_key(payload, args))
+    if cached is not None:
+        return cached
+
+    return build_payload(payload, args)
+
+
+def build_payload(payload, args):
+    value = frappe.get_attr(PAYLOADS[payload][0])(*args)
+    frappe.cache.set_value(get_cache_key(payload, args), value, expires_in_sec=CACHE_TTL)
+    return value
+
+
+def get_slices(payload, branches=None):
+    """Slices of the payload, only those of the given branches and of all branches when `branches` is set"""
+    slices = frappe.get_attr(PAYLOADS[payload][1])()
+    if branches is None:
+        return slices
+
+    return [args for args in slices if not args or args[-1] is None or args[-1] in branches]
+
+
+def get_expiring_slices(payload):
+    """Slices missing from the cache or expiring before the next cron run"""
+    return [
+        args
+        for args in get_slices(payload)
+        if frappe.cache.ttl(frappe.cache.make_key(get_cache_key(payload, args))) < REFRESH_MARGIN
+    ]
+
+
+def pop_dirty_branches(payload):
+    """Dirty branches of the payload ("" for none in particular), None for all of them.
+
+    Read and cleared in one transaction, so marks made meanwhile wait for the next run.
+    """
+    key = frappe.cache.make_key(f"{DIRTY_KEY}:{payload}")
+    pipeline = frappe.cache.pipeline()
+    pipeline.smembers(key)
+    pipeline.delete(key)
+    branches = {branch.decode() for branch in pipeline.execute()[0]}
+
+    return None if ALL_BRANCHES in branches else branches
+
+
+def refresh_payload(payload):
+    """Rebuild the dirty and the expiring slices of the payload"""
+    branches = pop_dirty_branches(payload)
+    slices = [] if branches == set() else get_slices(payload, branches)
+    slices += [args for args in get_expiring_slices(payload) if args not in slices]
+    if not slices:
+        return
+
+    with Span("dashboard_cache.refresh", payload=payload) as span:
+        for args in slices:
+            build_payload(payload, args)
+            span.count("slices")
+
+    frappe.publish_realtime(
+        DASHBOARD_UPDATED_EVENT,
+        {"dashboard": payload, "branches": sorted({args[-1] for args in slices if args and args[-1]})},
+    )
+
+
+def refresh_dashboards():
+    for payload in PAYLOADS:
+        refresh_payload(payload)
+
+
+def precompute_dashboards():
+    """Scheduled job: rebuild the dirty and expiring slices on the long queue"""
+    frappe.enqueue(
+        refresh_dashboards,
+        queue="long",
+        timeout=PRECOMPUTE_TIMEOUT,
+        job_id=f"dashboard_cache::{frappe.local.site}",
+        deduplicate=True,
+    )
+
+
+def mark_dirty(payload, branches=None, after_commit=True):
+    """Have the next cron run rebuild the slices of the branches, of every branch when `branches` is None.
+
+    The slices of all branches are rebuilt either way.
+    """
+    branches = [ALL_BRANCHES] if branches is None else [branch or "" for branch in branches] or [""]
+    mark = partial(frappe.cache.sadd, f"{DIRTY_KEY}:{payload}", *branches)
+
+    if after_commit:
+        frappe.db.after_commit.add(mark)
+    else:
+        mark()
+
+
+def on_purchase_invoice_change(doc, method=None):
+    """doc_events handler for Purchase Invoice on_submit / on_cancel"""
+    mark_dirty("unicom_kpis", [doc.get("branch")])
+
+
+def on_stock_change(doc, method=None):
+    """doc_events handler for Serial and Batch Bundle and Batch: batch stock or expiry changed"""
+    mark_dirty("batch_expiry")
@@ -0,0 +1,146 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, date_diff, getdate, now, today
+
+from unicom_chemist.unicom_chemist.dashboard_cache import mark_dirty as mark_dashboard_dirty
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+# (tier, lowest days to expiry in the tier), most urgent last; the Batch Expiry Dashboard's default buckets
+EXPIRY_TIERS = (
+	("Healthy", 365),
+	("Near Expiry", 180),
+	("Use Immediately", 0),
+)
+EXPIRED = "Expired"
+
+CHUNK_SIZE = 1000
+
+
+class BatchExpiryStatus(Document):
+	pass
+
+
+def get_expiry_tier(days_to_expiry):
+	"""(tier, lowest days to expiry of that tier or None when it is the last tier)"""
+	for tier, min_days in EXPIRY_TIERS:
+		if days_to_expiry >= min_days:
+			return tier, min_days
+
+	return EXPIRED, None
+
+
+def get_status_row(batch, item_code, expiry_date, batch_modified, on_date):
+	days_to_expiry = date_diff(expiry_date, on_date)
+	tier, min_days = get_expiry_tier(days_to_expiry)
+	# First day on which days to expiry drops below the tier's lower bound
+	next_tier_change = add_days(expiry_date, 1 - min_days) if min_days is not None else None
+
+	return {
+		"batch": batch,
+		"item_code": item_code,
+		"expiry_date": expiry_date,
+		"days_to_expiry": days_to_expiry,
+		"expiry_tier": tier,
+		"next_tier_change": next_tier_change,
+		"batch_modified": batch_modified,
+	}
+
+
+def update_batch_expiry_status():
+	"""Daily job: refresh days to expiry and re-tier only batches whose tier can have changed"""
+	on_date = getdate(today())
+
+	with Span("batch_expiry_status.update") as span:
+		# Days to expiry move for every batch, this is one set-based statement
+		frappe.db.sql(
+			"""
+			UPDATE `tabBatch Expiry Status`
+			SET days_to_expiry = DATEDIFF(expiry_date, %(on_date)s)
+			""",
+			{"on_date": on_date},
+		)
+
+		# Rows of batches that were disabled, deleted or lost their expiry date
+		frappe.db.sql(
+			"""
+			DELETE bes FROM `tabBatch Expiry Status` bes
+			LEFT JOIN `tabBatch` b ON b.name = bes.batch
+			WHERE b.name IS NULL OR b.disabled = 1 OR b.expiry_date IS NULL
+			"""
+		)
+
+		# New batches, batches changed since the last run and batches crossing into the next tier
+		batches = frappe.db.sql(
+			"""
+			SELECT b.name, b.item, b.expiry_date, b.modified
+			FROM `tabBatch` b
+			LEFT JOIN `tabBatch Expiry Status` bes ON bes.name = b.name
+			WHERE b.disabled = 0
+			AND b.expiry_date IS NOT NULL
+			AND (
+				bes.name IS NULL
+				OR bes.batch_modified < b.modified
+				OR bes.next_tier_change <= %(on_date)s
+			)
+			""",
+			{"on_date": on_date},
+		)
+		span.count("batches", len(batches))
+
+		for start in range(0, len(batches), CHUNK_SIZE):
+			chunk = batches[start : start + CHUNK_SIZE]
+			write_status_rows([get_status_row(*batch, on_date) for batch in chunk])
+			frappe.db.commit()
+
+	# The Batch Expiry Dashboard reads its buckets from this table
+	mark_dashboard_dirty("batch_expiry", after_commit=False)
+
+
+def update_batch_expiry_status_for(batch_nos):
+	"""Recompute the status of the given batches right away, e.g. when a Batch is saved"""
+	batch_nos = [name for name in batch_nos if name]
+	if not batch_nos:
+		return
+
+	on_date = getdate(today())
+	batches = frappe.db.sql(
+		"""
+		SELECT name, item, expiry_date, modified
+		FROM `tabBatch`
+		WHERE name IN %(batches)s
+		AND disabled = 0
+		AND expiry_date IS NOT NULL
+		""",
+		{"batches": tuple(batch_nos)},
+	)
+
+	frappe.db.delete("Batch Expiry Status", {"name": ("in", batch_nos)})
+	write_status_rows([get_status_row(*batch, on_date) for batch in batches], delete=False)
+
+
+def write_status_rows(rows, delete=True):
+	if not rows:
+		return
+
+	names = [row["batch"] for row in rows]
+	if delete:
+		frappe.db.delete("Batch Expiry Status", {"name": ("in", names)})
+
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", *rows[0].keys()]
+	values = [
+		(row["batch"], timestamp, timestamp, "Administrator", "Administrator", *row.values()) for row in rows
+	]
+	frappe.db.bulk_insert("Batch Expiry Status", fields, values)
+
+
+def on_batch_change(doc, method=None):
+	"""doc_events handler for Batch"""
+	if method == "on_trash":
+		frappe.db.delete("Batch Expiry Status", {"name": doc.name})
+	else:
+		update_batch_expiry_status_for([doc.name])
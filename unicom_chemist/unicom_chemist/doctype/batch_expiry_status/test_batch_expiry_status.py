@@ -0,0 +1,31 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from unicom_chemist.unicom_chemist.doctype.batch_expiry_status.batch_expiry_status import (
+	get_expiry_tier,
+	get_status_row,
+)
+
+
+class TestBatchExpiryStatus(FrappeTestCase):
+	def test_expiry_tier(self):
+		self.assertEqual(get_expiry_tier(-1)[0], "Expired")
+		self.assertEqual(get_expiry_tier(0)[0], "Use Immediately")
+		self.assertEqual(get_expiry_tier(179)[0], "Use Immediately")
+		self.assertEqual(get_expiry_tier(180)[0], "Near Expiry")
+		self.assertEqual(get_expiry_tier(365)[0], "Healthy")
+
+	def test_next_tier_change(self):
+		row = get_status_row("BATCH-1", "ITEM-1", getdate("2027-01-01"), None, getdate("2026-10-18"))
+
+		self.assertEqual(row["days_to_expiry"], 75)
+		self.assertEqual(row["expiry_tier"], "Use Immediately")
+		# Expired from the day after the expiry date
+		self.assertEqual(getdate(row["next_tier_change"]), getdate("2027-01-02"))
+
+		row = get_status_row("BATCH-1", "ITEM-1", getdate("2026-10-01"), None, getdate("2026-10-18"))
+		self.assertEqual(row["expiry_tier"], "Expired")
+		self.assertIsNone(row["next_tier_change"])
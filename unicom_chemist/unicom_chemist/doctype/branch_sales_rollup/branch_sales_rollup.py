@@ -0,0 +1,281 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+"""Daily sales totals per (posting date, company, branch, is_pos).
+
+Submitting, cancelling or paying an invoice marks the days it touches dirty
+in Redis, and one background job drains the marks, re-aggregating only each
+company's invoices of its dirty days. A burst of invoices costs one job.
+POS Invoices count as is_pos sales; consolidated Sales Invoices are left out
+because their POS Invoices are already counted. Refreshed branches have
+their dashboard payloads marked for a rebuild.
+"""
+
+from functools import partial
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, getdate, now, today
+
+from unicom_chemist.unicom_chemist.dashboard_cache import mark_dirty as mark_dashboard_dirty
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+# Days re-aggregated per statement by `rebuild`
+REBUILD_CHUNK_DAYS = 31
+
+# Seconds a refresh waits for another one of the same company, e.g. of the cron catch-up
+LOCK_TIMEOUT = 10
+
+# Redis set of "<posting date> <company>" waiting for a refresh
+DIRTY_KEY = "unicom_chemist:branch_sales_rollup:dirty"
+
+# Doctype: extra condition on its invoices
+SOURCES = {
+	"Sales Invoice": "inv.is_consolidated = 0",
+	"POS Invoice": "1 = 1",
+}
+
+ROLLUP_FIELDS = (
+	"posting_date",
+	"company",
+	"branch",
+	"is_pos",
+	"invoice_count",
+	"return_count",
+	"total_qty",
+	"grand_total",
+	"net_total",
+	"outstanding_amount",
+	"return_amount",
+)
+
+SUM_FIELDS = ROLLUP_FIELDS[4:]
+
+
+class BranchSalesRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Branch Sales Rollup", ["company", "posting_date"])
+
+
+def get_rollup_rows(conditions, params):
+	"""Aggregated rollup rows of the invoices matching `conditions` (on alias `inv`)"""
+	rows = {}
+
+	for doctype, source_condition in SOURCES.items():
+		for row in frappe.db.sql(
+			f"""
+			SELECT
+				inv.posting_date,
+				inv.company,
+				IFNULL(inv.branch, '') AS branch,
+				{"1" if doctype == "POS Invoice" else "inv.is_pos"} AS is_pos,
+				SUM(IF(inv.is_return = 1, 0, 1)) AS invoice_count,
+				SUM(IF(inv.is_return = 1, 1, 0)) AS return_count,
+				SUM(inv.total_qty) AS total_qty,
+				SUM(inv.grand_total) AS grand_total,
+				SUM(inv.net_total) AS net_total,
+				SUM(inv.outstanding_amount) AS outstanding_amount,
+				-SUM(IF(inv.is_return = 1, inv.grand_total, 0)) AS return_amount
+			FROM `tab{doctype}` inv
+			WHERE inv.docstatus = 1
+			AND {source_condition}
+			AND {conditions}
+			GROUP BY 1, 2, 3, 4
+			""",
+			params,
+			as_dict=1,
+		):
+			# A day can have POS sales in both Sales Invoices and POS Invoices
+			key = (row.posting_date, row.company, row.branch, row.is_pos)
+			if key in rows:
+				for field in SUM_FIELDS:
+					rows[key][field] += row[field] or 0
+			else:
+				rows[key] = row
+
+	return list(rows.values())
+
+
+def write_rollup_rows(rows):
+	if not rows:
+		return
+
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"Branch Sales Rollup",
+		["name", *ROLLUP_FIELDS, "creation", "modified", "owner", "modified_by"],
+		[
+			(
+				frappe.generate_hash(length=12),
+				*(row[field] for field in ROLLUP_FIELDS),
+				timestamp,
+				timestamp,
+				"Administrator",
+				"Administrator",
+			)
+			for row in rows
+		],
+	)
+
+
+def refresh_rollup(company, posting_dates):
+	"""Re-aggregate the rollup of one company for the given days; False if another refresh holds the company"""
+	posting_dates = sorted({getdate(posting_date) for posting_date in posting_dates if posting_date})
+	if not posting_dates:
+		return True
+
+	# Refreshes of the same company are serialized, so a later one never writes older totals
+	lock_name = f"branch_sales_rollup:{frappe.local.site}:{company}"
+	if not frappe.db.sql("SELECT GET_LOCK(%s, %s)", (lock_name, LOCK_TIMEOUT))[0][0]:
+		# Writing without the lock could interleave with the running refresh, leave the days for later
+		mark_dirty(company, posting_dates)
+		return False
+
+	try:
+		with Span("branch_sales_rollup.refresh", company=company) as span:
+			params = {"company": company, "posting_dates": tuple(posting_dates)}
+			rows = get_rollup_rows("inv.company = %(company)s AND inv.posting_date IN %(posting_dates)s", params)
+			branches = {row.branch for row in rows}
+			branches.update(
+				frappe.db.sql_list(
+					"""
+					SELECT DISTINCT branch FROM `tabBranch Sales Rollup`
+					WHERE company = %(company)s AND posting_date IN %(posting_dates)s
+					""",
+					params,
+				)
+			)
+
+			frappe.db.sql(
+				"""
+				DELETE FROM `tabBranch Sales Rollup`
+				WHERE company = %(company)s AND posting_date IN %(posting_dates)s
+				""",
+				params,
+			)
+			write_rollup_rows(rows)
+			frappe.db.commit()
+			span.count("rows", len(rows))
+	finally:
+		frappe.db.sql("SELECT RELEASE_LOCK(%s)", (lock_name,))
+
+	for payload in ("unicom_kpis", "unicom_charts"):
+		mark_dashboard_dirty(payload, branches, after_commit=False)
+
+	return True
+
+
+def queue_refresh(company, posting_dates):
+	"""Mark the days dirty and queue their refresh once the current transaction is committed"""
+	frappe.db.after_commit.add(partial(mark_dirty, company, posting_dates))
+
+
+def mark_dirty(company, posting_dates):
+	members = {f"{getdate(posting_date)} {company}" for posting_date in posting_dates if posting_date}
+	if not members:
+		return
+
+	frappe.cache.sadd(DIRTY_KEY, *members)
+	enqueue_dirty_refresh()
+
+
+def enqueue_dirty_refresh():
+	"""Queue the job draining the dirty days; one at a time, marks made while it runs are drained by it too"""
+	frappe.enqueue(
+		refresh_dirty_days,
+		queue="short",
+		job_id=f"branch_sales_rollup::{frappe.local.site}",
+		deduplicate=True,
+	)
+
+
+def pop_dirty_days():
+	"""{company: [posting dates]} marked dirty, read and cleared in one transaction"""
+	key = frappe.cache.make_key(DIRTY_KEY)
+	pipeline = frappe.cache.pipeline()
+	pipeline.smembers(key)
+	pipeline.delete(key)
+
+	days = {}
+	for member in pipeline.execute()[0]:
+		posting_date, company = member.decode().split(" ", 1)
+		days.setdefault(company, []).append(posting_date)
+
+	return days
+
+
+def refresh_dirty_days():
+	"""Background job: refresh the dirty days until none are left"""
+	while days := pop_dirty_days():
+		refreshed = [refresh_rollup(company, posting_dates) for company, posting_dates in days.items()]
+		if not all(refreshed):
+			# Another refresh holds a company and its days are marked again; the cron takes them up
+			break
+
+
+def on_invoice_change(doc, method=None):
+	"""doc_events handler for Sales Invoice and POS Invoice on_submit / on_cancel / on_update_after_submit"""
+	posting_dates = [doc.posting_date]
+
+	# A return changes the outstanding amount of the invoice it is against
+	if doc.get("is_return") and doc.get("return_against"):
+		posting_dates.append(frappe.db.get_value(doc.doctype, doc.return_against, "posting_date"))
+
+	queue_refresh(doc.company, posting_dates)
+
+
+def on_payment_entry_change(doc, method=None):
+	"""doc_events handler for Payment Entry: outstanding amounts of the paid invoices change"""
+	for doctype in SOURCES:
+		invoices = [
+			reference.reference_name
+			for reference in doc.get("references") or []
+			if reference.reference_doctype == doctype and reference.reference_name
+		]
+		if invoices:
+			posting_dates = frappe.get_all(
+				doctype, filters={"name": ("in", invoices)}, pluck="posting_date", distinct=True
+			)
+			queue_refresh(doc.company, posting_dates)
+
+
+def rebuild(from_date=None, to_date=None):
+	"""Re-aggregate the whole rollup, or the given period, for backfill and repair"""
+	from_date = from_date or get_first_posting_date()
+	if not from_date:
+		return
+
+	from_date, to_date = getdate(from_date), getdate(to_date or today())
+
+	with Span("branch_sales_rollup.rebuild", from_date=from_date, to_date=to_date) as span:
+		while from_date <= to_date:
+			chunk_end = min(add_days(from_date, REBUILD_CHUNK_DAYS - 1), to_date)
+			params = {"from_date": from_date, "to_date": chunk_end}
+
+			rows = get_rollup_rows("inv.posting_date BETWEEN %(from_date)s AND %(to_date)s", params)
+			frappe.db.sql(
+				"""
+				DELETE FROM `tabBranch Sales Rollup`
+				WHERE posting_date BETWEEN %(from_date)s AND %(to_date)s
+				""",
+				params,
+			)
+			write_rollup_rows(rows)
+			if not frappe.flags.in_test:
+				frappe.db.commit()
+
+			span.count("rows", len(rows))
+			from_date = add_days(chunk_end, 1)
+
+
+def get_first_posting_date():
+	dates = [
+		frappe.db.sql(f"SELECT MIN(posting_date) FROM `tab{doctype}` WHERE docstatus = 1")[0][0]
+		for doctype in SOURCES
+	]
+	dates = [posting_date for posting_date in dates if posting_date]
+	return min(dates) if dates else None
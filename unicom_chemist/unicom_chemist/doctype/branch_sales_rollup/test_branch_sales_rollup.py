@@ -0,0 +1,45 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, today
+
+from unicom_chemist.unicom_chemist.doctype.branch_sales_rollup.branch_sales_rollup import rebuild
+
+
+TEST_BRANCH = "_Test Rollup Branch"
+
+
+class TestBranchSalesRollup(FrappeTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Branch", TEST_BRANCH):
+			frappe.get_doc({"doctype": "Branch", "branch": TEST_BRANCH, "custom_abbr": "ZZR"}).insert()
+
+	def test_rebuild_matches_invoices(self):
+		first = make_invoice(qty=2, rate=100)
+		make_invoice(qty=1, rate=50)
+		make_invoice(qty=-1, rate=100, is_return=1, return_against=first.name)
+
+		rebuild(today(), today())
+
+		rollup = frappe.get_all(
+			"Branch Sales Rollup",
+			filters={"branch": TEST_BRANCH, "posting_date": today(), "company": first.company},
+			fields=["invoice_count", "return_count", "total_qty", "grand_total", "return_amount"],
+		)
+		self.assertEqual(len(rollup), 1)
+		self.assertEqual(rollup[0].invoice_count, 2)
+		self.assertEqual(rollup[0].return_count, 1)
+		self.assertEqual(flt(rollup[0].total_qty), 2)
+		self.assertAlmostEqual(flt(rollup[0].grand_total), 150, places=2)
+		self.assertAlmostEqual(flt(rollup[0].return_amount), 100, places=2)
+
+
+def make_invoice(**args):
+	invoice = create_sales_invoice(posting_date=today(), do_not_save=1, **args)
+	invoice.branch = TEST_BRANCH
+	invoice.insert()
+	invoice.submit()
+	return invoice
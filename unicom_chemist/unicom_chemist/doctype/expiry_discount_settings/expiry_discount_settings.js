@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Amit Kumar and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Expiry Discount Settings", {
+// 	refresh(frm) {
+
+// 	},
+// });
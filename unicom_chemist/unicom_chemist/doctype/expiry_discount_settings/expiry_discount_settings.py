@@ -0,0 +1,22 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+
+class ExpiryDiscountSettings(Document):
+	def validate(self):
+		seen = set()
+		for tier in self.tiers:
+			if tier.days_to_expiry in seen:
+				frappe.throw(_("Row {0}: Duplicate tier for {1} days").format(tier.idx, tier.days_to_expiry))
+			seen.add(tier.days_to_expiry)
+
+			if not 0 <= tier.discount_percentage <= 100:
+				frappe.throw(_("Row {0}: Discount must be between 0 and 100").format(tier.idx))
+
+		self.tiers.sort(key=lambda tier: tier.days_to_expiry)
+		for idx, tier in enumerate(self.tiers, start=1):
+			tier.idx = idx
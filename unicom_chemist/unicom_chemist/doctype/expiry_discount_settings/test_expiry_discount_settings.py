@@ -0,0 +1,29 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from unicom_chemist.unicom_chemist.expiry_discount import get_discount_for_days
+
+
+class TestExpiryDiscountSettings(FrappeTestCase):
+	def test_discount_for_days(self):
+		tiers = [(60, 50), (90, 30)]
+
+		self.assertEqual(get_discount_for_days(-5, tiers), 50)
+		self.assertEqual(get_discount_for_days(60, tiers), 50)
+		self.assertEqual(get_discount_for_days(61, tiers), 30)
+		self.assertEqual(get_discount_for_days(90, tiers), 30)
+		self.assertEqual(get_discount_for_days(91, tiers), 0)
+
+	def test_tiers_sorted_and_unique(self):
+		settings = frappe.get_single("Expiry Discount Settings")
+		settings.tiers = []
+		settings.append("tiers", {"days_to_expiry": 90, "discount_percentage": 30})
+		settings.append("tiers", {"days_to_expiry": 60, "discount_percentage": 50})
+		settings.validate()
+		self.assertEqual([tier.days_to_expiry for tier in settings.tiers], [60, 90])
+
+		settings.append("tiers", {"days_to_expiry": 60, "discount_percentage": 40})
+		self.assertRaises(frappe.ValidationError, settings.validate)
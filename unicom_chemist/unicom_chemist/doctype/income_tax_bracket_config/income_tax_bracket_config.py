@@ -0,0 +1,34 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from unicom_chemist.unicom_chemist.income_tax import clear_income_tax_cache
+
+
+class IncomeTaxBracketConfig(Document):
+	def validate(self):
+		for field in ("ssf_rate", "pf_rate"):
+			if not 0 <= (self.get(field) or 0) <= 100:
+				frappe.throw(_("{0} must be between 0 and 100").format(self.meta.get_label(field)))
+
+		seen = set()
+		for bracket in self.brackets:
+			if bracket.from_amount in seen:
+				frappe.throw(_("Row {0}: Duplicate bracket above {1}").format(bracket.idx, bracket.from_amount))
+			seen.add(bracket.from_amount)
+
+			if not 0 <= bracket.rate <= 100:
+				frappe.throw(_("Row {0}: Rate must be between 0 and 100").format(bracket.idx))
+
+		self.brackets.sort(key=lambda bracket: bracket.from_amount)
+		for idx, bracket in enumerate(self.brackets, start=1):
+			bracket.idx = idx
+
+	def on_update(self):
+		clear_income_tax_cache()
+
+	def on_trash(self):
+		clear_income_tax_cache()
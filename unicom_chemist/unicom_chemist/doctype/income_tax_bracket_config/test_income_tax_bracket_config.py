@@ -0,0 +1,70 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from unicom_chemist.unicom_chemist.income_tax import (
+	DEFAULT_CONFIG,
+	INCOME_TAX_TABLES_KEY,
+	IncomeTaxTable,
+	create_default_config,
+	get_income_tax_table,
+)
+
+
+def get_default_table():
+	return IncomeTaxTable(
+		DEFAULT_CONFIG["ssf_rate"],
+		DEFAULT_CONFIG["pf_rate"],
+		DEFAULT_CONFIG["tax_relief"],
+		[(bracket["from_amount"], bracket["rate"]) for bracket in DEFAULT_CONFIG["brackets"]],
+	)
+
+
+class TestIncomeTaxBracketConfig(FrappeTestCase):
+	def test_default_brackets(self):
+		table = get_default_table()
+
+		self.assertEqual(table.get_tax(-100), 0)
+		self.assertEqual(table.get_tax(490), 0)
+		self.assertAlmostEqual(table.get_tax(600), 5.5)
+		self.assertAlmostEqual(table.get_tax(730), 18.5)
+		self.assertAlmostEqual(table.get_tax(1000), 18.5 + 270 * 0.175)
+		self.assertEqual(table.get_taxes([490, 600, 730]), [table.get_tax(amount) for amount in (490, 600, 730)])
+
+	def test_taxable_amount(self):
+		table = get_default_table()
+
+		self.assertAlmostEqual(table.get_taxable_amount(2000), 2000 - 2000 * 0.055 - 2000 * 0.03 - 150)
+
+	def test_brackets_sorted_and_unique(self):
+		config = frappe.new_doc("Income Tax Bracket Config")
+		config.effective_from = "2099-01-01"
+		config.append("brackets", {"from_amount": 600, "rate": 10})
+		config.append("brackets", {"from_amount": 490, "rate": 5})
+		config.validate()
+		self.assertEqual([bracket.from_amount for bracket in config.brackets], [490, 600])
+
+		config.append("brackets", {"from_amount": 490, "rate": 7})
+		self.assertRaises(frappe.ValidationError, config.validate)
+
+	def test_saved_config_applies_once_committed(self):
+		create_default_config()
+		generation_key = f"{INCOME_TAX_TABLES_KEY}:generation"
+		previous_table = get_income_tax_table("2099-06-01")
+		generation = frappe.cache.get_value(generation_key)
+
+		config = frappe.new_doc("Income Tax Bracket Config")
+		config.effective_from = "2099-01-01"
+		config.append("brackets", {"from_amount": 0, "rate": 50})
+		config.insert()
+
+		# This worker sees its own change, the others keep the committed table until the commit
+		self.assertIsNot(get_income_tax_table("2099-06-01"), previous_table)
+		self.assertAlmostEqual(get_income_tax_table("2099-06-01").get_tax(100), 50)
+		self.assertEqual(frappe.cache.get_value(generation_key), generation)
+
+		frappe.db.after_commit.run()
+		self.assertNotEqual(frappe.cache.get_value(generation_key), generation)
+		self.assertAlmostEqual(get_income_tax_table("2099-06-01").get_tax(100), 50)
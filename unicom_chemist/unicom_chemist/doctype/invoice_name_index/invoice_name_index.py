@@ -0,0 +1,185 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+
+# SI-<abbr>-YY-## and POS-<abbr>-YY-##, optionally with the amendment suffix
+INVOICE_NAME_PATTERN = re.compile(r"^([A-Z]+)-([A-Z0-9]+)-(\d{2})-(\d+)(?:-\d+)?$")
+
+# Number fragment typed at the counter: [<abbr>-][YY-]<digits>
+NAME_FRAGMENT_PATTERN = re.compile(r"^(?:(?:([A-Z0-9]+)-)?(\d{2})-)?(\d+)$")
+
+# Branch abbreviation and year: <abbr>-YY
+BRANCH_YEAR_PATTERN = re.compile(r"^([A-Z][A-Z0-9]*)-(\d{2})-?$")
+
+CHUNK_SIZE = 5000
+
+
+class InvoiceNameIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Invoice Name Index", ["sequence", "year"])
+
+
+def parse_invoice_name(name):
+	"""{"invoice_prefix", "branch_abbr", "year", "sequence", "sequence_text"} or None for names of another shape"""
+	match = INVOICE_NAME_PATTERN.match((name or "").upper())
+	if not match:
+		return None
+
+	prefix, branch_abbr, year, sequence = match.groups()
+	return {
+		"invoice_prefix": prefix,
+		"branch_abbr": branch_abbr,
+		"year": int(year),
+		"sequence": int(sequence),
+		"sequence_text": sequence,
+	}
+
+
+def index_invoices(names):
+	rows = []
+	for name in names:
+		parts = parse_invoice_name(name)
+		if parts:
+			rows.append((name, name, *parts.values()))
+
+	if not rows:
+		return
+
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"Invoice Name Index",
+		[
+			"name",
+			"invoice",
+			"invoice_prefix",
+			"branch_abbr",
+			"year",
+			"sequence",
+			"sequence_text",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		[(*row, timestamp, timestamp, "Administrator", "Administrator") for row in rows],
+		ignore_duplicates=True,
+	)
+
+
+def backfill():
+	"""Index every existing Sales Invoice, in chunks"""
+	last_name = ""
+	while True:
+		names = frappe.db.sql_list(
+			"""
+			SELECT name FROM `tabSales Invoice`
+			WHERE name > %s
+			ORDER BY name
+			LIMIT %s
+			""",
+			(last_name, CHUNK_SIZE),
+		)
+		if not names:
+			break
+
+		index_invoices(names)
+		frappe.db.commit()
+		last_name = names[-1]
+
+
+def on_invoice_insert(doc, method=None):
+	"""doc_events after_insert handler for Sales Invoice"""
+	index_invoices([doc.name])
+
+
+def on_invoice_trash(doc, method=None):
+	frappe.db.delete("Invoice Name Index", {"name": doc.name})
+
+
+def get_invoice_id_condition(invoice_id):
+	"""SQL condition on `si.name` and params for what counter staff typed.
+
+	First the indexed lookup of `get_indexed_condition`. Only when it finds no
+	invoice at all is the old `LIKE '%<text>%'` search used, so the full scan
+	is left to text that does not start any invoice name or sequence.
+	"""
+	text = invoice_id.strip().upper()
+
+	parts = parse_invoice_name(text)
+	if parts and text.count("-") > 3:
+		# The amendment suffix is not indexed, amended names are looked up by primary key
+		return "si.name = %(invoice_id)s", {"invoice_id": text}
+
+	condition, params = get_indexed_condition(text)
+	if frappe.db.sql(f"SELECT 1 FROM `tabInvoice Name Index` si WHERE {condition} LIMIT 1", params):
+		return condition, params
+
+	return "si.name LIKE %(invoice_id)s", {"invoice_id": f"%{invoice_id}%"}
+
+
+def get_indexed_condition(text):
+	"""Condition finding the invoices whose name or sequence starts with `text`, through indexes only.
+
+	Names and number fragments are looked up in the indexed parts: "12" finds
+	the sequences 12, 120 and 1200, "26-12" and "ABBR-26-12" those of that
+	year (and branch), a full name also the names it is the beginning of.
+	The typed number also matches as a number, so "26-7" and "SI-ABBR-26-7"
+	find "-26-07". "ABBR-26" is a branch and year; anything else is a prefix
+	match on the primary key.
+	"""
+	if parts := parse_invoice_name(text):
+		return get_index_condition(
+			parts["sequence_text"],
+			invoice_prefix=parts["invoice_prefix"],
+			branch_abbr=parts["branch_abbr"],
+			year=parts["year"],
+		)
+
+	if match := NAME_FRAGMENT_PATTERN.match(text):
+		branch_abbr, year, sequence_text = match.groups()
+		return get_index_condition(sequence_text, branch_abbr=branch_abbr, year=int(year) if year else None)
+
+	if match := BRANCH_YEAR_PATTERN.match(text):
+		branch_abbr, year = match.groups()
+		return get_index_condition(branch_abbr=branch_abbr, year=int(year))
+
+	return "si.name LIKE %(invoice_id)s", {"invoice_id": f"{text}%"}
+
+
+def get_index_condition(sequence_text=None, **parts):
+	"""`si.name` among the indexed names with the given parts and a sequence matching `sequence_text`, if given.
+
+	The sequence is the typed number or starts with the typed text. The two
+	matches are separate SELECTs of a UNION, so each uses its own index
+	instead of an OR that scans the table.
+	"""
+	conditions = []
+	params = {}
+	for field, value in parts.items():
+		if value is not None:
+			conditions.append(f"{field} = %(invoice_{field})s")
+			params[f"invoice_{field}"] = value
+
+	if sequence_text is None:
+		sequence_conditions = [[]]
+	else:
+		sequence_conditions = [
+			["sequence = %(invoice_sequence)s"],
+			["sequence_text LIKE %(invoice_sequence_text)s"],
+		]
+		params.update(invoice_sequence=int(sequence_text), invoice_sequence_text=f"{sequence_text}%")
+
+	selects = " UNION ".join(
+		f"SELECT name FROM `tabInvoice Name Index` WHERE {' AND '.join(sequence + conditions)}"
+		for sequence in sequence_conditions
+	)
+	return f"si.name IN ({selects})", params
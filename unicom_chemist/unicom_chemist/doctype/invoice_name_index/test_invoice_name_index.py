@@ -0,0 +1,61 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from unicom_chemist.unicom_chemist.doctype.invoice_name_index.invoice_name_index import (
+	get_indexed_condition,
+	get_invoice_id_condition,
+	index_invoices,
+	parse_invoice_name,
+)
+
+
+TEST_NAMES = ("SI-ZZT-99-07", "SI-ZZT-99-120", "SI-ZZT-99-312", "SI-ZZT-98-12", "SI-ZZU-99-1200-1")
+
+
+class TestInvoiceNameIndex(FrappeTestCase):
+	def test_parse_invoice_name(self):
+		self.assertEqual(
+			parse_invoice_name("SI-ACC-26-07"),
+			{"invoice_prefix": "SI", "branch_abbr": "ACC", "year": 26, "sequence": 7, "sequence_text": "07"},
+		)
+		self.assertEqual(parse_invoice_name("POS-ACC-26-1234-1")["sequence"], 1234)
+		self.assertIsNone(parse_invoice_name("ACC-INV-2026-00001x"))
+
+	def test_invoice_id_condition(self):
+		condition, params = get_indexed_condition("26-7")
+		self.assertIn("tabInvoice Name Index", condition)
+		self.assertNotIn("%7%", str(params))
+		self.assertEqual(params, {"invoice_sequence": 7, "invoice_sequence_text": "7%", "invoice_year": 26})
+		self.assertEqual(get_indexed_condition("ABBR-26")[1], {"invoice_branch_abbr": "ABBR", "invoice_year": 26})
+		self.assertEqual(get_indexed_condition("ACC-INV")[1], {"invoice_id": "ACC-INV%"})
+
+		self.assertEqual(get_invoice_id_condition("si-acc-26-07-1")[1], {"invoice_id": "SI-ACC-26-07-1"})
+		self.assertEqual(get_invoice_id_condition("x/y")[1], {"invoice_id": "%x/y%"})
+
+	def test_search_indexed_invoices(self):
+		index_invoices(TEST_NAMES)
+
+		def search(invoice_id):
+			condition, params = get_invoice_id_condition(invoice_id)
+			names = frappe.db.sql_list(f"SELECT si.name FROM `tabInvoice Name Index` si WHERE {condition}", params)
+			return {name for name in names if name in TEST_NAMES}
+
+		# A number fragment finds the sequences starting with it
+		self.assertEqual(search("12"), {"SI-ZZT-99-120", "SI-ZZT-98-12", "SI-ZZU-99-1200-1"})
+		self.assertEqual(search("99-12"), {"SI-ZZT-99-120", "SI-ZZU-99-1200-1"})
+
+		# Text that starts no name or sequence falls back to the substring search
+		self.assertEqual(search("T-99-3"), {"SI-ZZT-99-312"})
+
+		# Unpadded numbers and names find the zero padded ones
+		self.assertEqual(search("7"), {"SI-ZZT-99-07"})
+		self.assertEqual(search("ZZT-99-7"), {"SI-ZZT-99-07"})
+		self.assertEqual(search("SI-ZZT-99-7"), {"SI-ZZT-99-07"})
+		self.assertEqual(search("SI-ZZT-99-12"), {"SI-ZZT-99-120"})
+
+		self.assertEqual(search("si-zzt"), {"SI-ZZT-99-07", "SI-ZZT-99-120", "SI-ZZT-99-312", "SI-ZZT-98-12"})
+		self.assertEqual(search("ZZT-99"), {"SI-ZZT-99-07", "SI-ZZT-99-120", "SI-ZZT-99-312"})
+		self.assertEqual(search("SI-ZZU-99-1200-1"), {"SI-ZZU-99-1200-1"})
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Amit Kumar and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Item Movement Class", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,222 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# For license information, please see license.txt
+
+"""Nightly Pareto classification of the items sold in the last two years.
+
+Per branch and over all branches, items are ranked by quantity and by sales
+value, and the cumulative share of the items ranked above each one decides
+its class: the items making up the first `FAST_SHARE` percent of the
+quantity are Fast, the rest Slow; `ABC_SHARES` does the same on value for
+A/B/C. Aggregation, ranking and shares are computed by the database in one
+set-based query. Branch rows are stored in this doctype and the all-branch
+movement is written to Item.custom_abc_category, Non-Moving for items that
+did not sell. The Unicom Dashboard shows the item counts per movement.
+"""
+
+from collections import defaultdict
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, create_batch, now, today
+
+from unicom_chemist.unicom_chemist.dashboard_cache import mark_dirty as mark_dashboard_dirty
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+HISTORY_DAYS = 730
+
+# Cumulative quantity share (percent) covered by the Fast items
+FAST_SHARE = 80
+
+# ABC class: cumulative value share (percent) it ends at
+ABC_SHARES = (
+	("A", 80),
+	("B", 95),
+	("C", 100),
+)
+
+NON_MOVING = "Non-Moving"
+
+# Items per UPDATE of Item.custom_abc_category
+UPDATE_BATCH_SIZE = 1000
+
+# Doctype: extra condition on its invoices, as in the Branch Sales Rollup
+SOURCES = {
+	"Sales Invoice": "inv.is_consolidated = 0",
+	"POS Invoice": "1 = 1",
+}
+
+CLASS_FIELDS = (
+	"item_code",
+	"item_name",
+	"branch",
+	"movement",
+	"abc_class",
+	"sold_qty",
+	"sales_amount",
+	"invoice_count",
+	"last_sold_on",
+	"daily_velocity",
+	"qty_share",
+	"value_share",
+)
+
+
+class ItemMovementClass(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Movement Class", ["branch", "movement"])
+
+
+def classify_items():
+	"""Scheduled job: reclassify every item from the sales of the last `HISTORY_DAYS` days"""
+	to_date = today()
+	from_date = add_days(to_date, -HISTORY_DAYS + 1)
+
+	with Span("item_movement_class.classify", from_date=from_date, to_date=to_date) as span:
+		rows = get_class_rows(from_date, to_date)
+		branch_rows = [row for row in rows if row.branch is not None]
+		categories = {row.item_code: row.movement for row in rows if row.branch is None}
+
+		write_class_rows(branch_rows)
+		changed = update_item_categories(categories)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+		span.count("rows", len(branch_rows))
+		span.count("items_changed", changed)
+
+	mark_dashboard_dirty("unicom_kpis", after_commit=False)
+
+
+def get_class_rows(from_date, to_date):
+	"""Classified sales per item and branch, and per item over all branches (branch NULL)"""
+	lines = " UNION ALL ".join(
+		f"""
+		SELECT
+			item.item_code,
+			IFNULL(inv.branch, '') AS branch,
+			item.stock_qty AS qty,
+			item.base_net_amount AS amount,
+			inv.name AS invoice,
+			inv.posting_date
+		FROM `tab{doctype}` inv
+		INNER JOIN `tab{doctype} Item` item ON item.parent = inv.name
+		WHERE inv.docstatus = 1
+		AND {source_condition}
+		AND inv.posting_date BETWEEN %(from_date)s AND %(to_date)s
+		"""
+		for doctype, source_condition in SOURCES.items()
+	)
+
+	abc_class = " ".join(
+		f"WHEN value_share_before < {share} THEN '{abc_class}'" for abc_class, share in ABC_SHARES[:-1]
+	)
+
+	return frappe.db.sql(
+		f"""
+		WITH branch_sales AS (
+			SELECT
+				item_code,
+				branch,
+				SUM(qty) AS sold_qty,
+				SUM(amount) AS sales_amount,
+				COUNT(DISTINCT invoice) AS invoice_count,
+				MIN(posting_date) AS first_sold_on,
+				MAX(posting_date) AS last_sold_on
+			FROM ({lines}) sales_lines
+			GROUP BY item_code, branch
+		),
+		item_sales AS (
+			SELECT * FROM branch_sales
+			UNION ALL
+			SELECT
+				item_code,
+				NULL,
+				SUM(sold_qty),
+				SUM(sales_amount),
+				SUM(invoice_count),
+				MIN(first_sold_on),
+				MAX(last_sold_on)
+			FROM branch_sales
+			GROUP BY item_code
+		),
+		ranked AS (
+			SELECT
+				item_sales.*,
+				100 * SUM(sold_qty) OVER (
+					PARTITION BY branch ORDER BY sold_qty DESC, item_code ROWS UNBOUNDED PRECEDING
+				) / SUM(sold_qty) OVER (PARTITION BY branch) AS qty_share,
+				100 * SUM(sales_amount) OVER (
+					PARTITION BY branch ORDER BY sales_amount DESC, item_code ROWS UNBOUNDED PRECEDING
+				) / SUM(sales_amount) OVER (PARTITION BY branch) AS value_share,
+				100 * sold_qty / SUM(sold_qty) OVER (PARTITION BY branch) AS own_qty_share,
+				100 * sales_amount / SUM(sales_amount) OVER (PARTITION BY branch) AS own_value_share
+			FROM item_sales
+			WHERE sold_qty > 0
+		)
+		SELECT
+			classified.item_code,
+			item.item_name,
+			classified.branch,
+			IF(qty_share - own_qty_share < %(fast_share)s, 'Fast', 'Slow') AS movement,
+			CASE {abc_class} ELSE '{ABC_SHARES[-1][0]}' END AS abc_class,
+			sold_qty,
+			sales_amount,
+			invoice_count,
+			last_sold_on,
+			sold_qty / (DATEDIFF(%(to_date)s, first_sold_on) + 1) AS daily_velocity,
+			qty_share,
+			IFNULL(value_share, 0) AS value_share
+		FROM (
+			SELECT *, IFNULL(value_share - own_value_share, 100) AS value_share_before FROM ranked
+		) classified
+		INNER JOIN `tabItem` item ON item.name = classified.item_code
+		""",
+		{"from_date": from_date, "to_date": to_date, "fast_share": FAST_SHARE},
+		as_dict=1,
+	)
+
+
+def write_class_rows(rows):
+	frappe.db.sql("DELETE FROM `tabItem Movement Class`")
+	if not rows:
+		return
+
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"Item Movement Class",
+		["name", *CLASS_FIELDS, "creation", "modified", "owner", "modified_by"],
+		[
+			(
+				frappe.generate_hash(length=12),
+				*(row[field] for field in CLASS_FIELDS),
+				timestamp,
+				timestamp,
+				"Administrator",
+				"Administrator",
+			)
+			for row in rows
+		],
+	)
+
+
+def update_item_categories(categories):
+	"""Set Item.custom_abc_category where it changed, one UPDATE per category and batch; returns the count"""
+	changed = defaultdict(list)
+	for item_code, category in frappe.db.sql("SELECT name, IFNULL(custom_abc_category, '') FROM `tabItem`"):
+		new_category = categories.get(item_code, NON_MOVING)
+		if new_category != category:
+			changed[new_category].append(item_code)
+
+	for category, item_codes in changed.items():
+		for batch in create_batch(item_codes, UPDATE_BATCH_SIZE):
+			frappe.db.sql(
+				"UPDATE `tabItem` SET custom_abc_category = %s WHERE name IN %s", (category, tuple(batch))
+			)
+			for item_code in batch:
+				frappe.clear_document_cache("Item", item_code)
+
+	return sum(len(item_codes) for item_codes in changed.values())
@@ -0,0 +1,51 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.stock.doctype.item.test_item import make_item
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import today
+
+from unicom_chemist.unicom_chemist.doctype.item_movement_class.item_movement_class import (
+	NON_MOVING,
+	classify_items,
+)
+
+
+TEST_BRANCH = "_Test Movement Branch"
+
+
+class TestItemMovementClass(FrappeTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Branch", TEST_BRANCH):
+			frappe.get_doc({"doctype": "Branch", "branch": TEST_BRANCH, "custom_abbr": "ZZM"}).insert()
+
+	def test_classify_items(self):
+		fast, medium, slow, unsold = (
+			make_item(f"_Test Movement Item {name}", {"is_stock_item": 0}).name
+			for name in ("Fast", "Medium", "Slow", "Unsold")
+		)
+
+		# 80% / 15% / 5% of the branch's quantity and value
+		for item_code, qty in ((fast, 80), (medium, 15), (slow, 5)):
+			make_invoice(item=item_code, qty=qty, rate=10)
+
+		classify_items()
+
+		classes = {
+			row.item_code: (row.movement, row.abc_class)
+			for row in frappe.get_all(
+				"Item Movement Class", filters={"branch": TEST_BRANCH}, fields=["item_code", "movement", "abc_class"]
+			)
+		}
+		self.assertEqual(classes, {fast: ("Fast", "A"), medium: ("Slow", "B"), slow: ("Slow", "C")})
+		self.assertEqual(frappe.db.get_value("Item", unsold, "custom_abc_category"), NON_MOVING)
+
+
+def make_invoice(**args):
+	invoice = create_sales_invoice(posting_date=today(), do_not_save=1, **args)
+	invoice.branch = TEST_BRANCH
+	invoice.insert()
+	invoice.submit()
+	return invoice
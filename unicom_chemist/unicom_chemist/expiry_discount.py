@@ -0,0 +1,83 @@
+import frappe
+from frappe import _
+from frappe.utils import date_diff, getdate, today
+
+from unicom_chemist.unicom_chemist.batch_expiry import get_batch_expiry_dates, get_bundle_batches
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+def get_discount_tiers():
+    """[(days_to_expiry, discount_percentage)] sorted by days, or [] when disabled"""
+    settings = frappe.get_cached_doc("Expiry Discount Settings")
+    if not settings.enabled:
+        return []
+
+    return sorted((tier.days_to_expiry, tier.discount_percentage) for tier in settings.tiers)
+
+
+def get_discount_for_days(days, tiers):
+    """Discount of the first tier (fewest days) the given days to expiry fall within"""
+    for max_days, discount in tiers:
+        if days <= max_days:
+            return discount
+
+    return 0
+
+
+def get_bundle_batch_expiry(bundle_names):
+    """{bundle_name: [batch expiry dates]} for all bundles, from the shared batch expiry cache"""
+    bundle_batches = get_bundle_batches(bundle_names)
+    expiry_dates = get_batch_expiry_dates(
+        batch_no for batch_nos in bundle_batches.values() for batch_no in batch_nos
+    )
+
+    expiry_map = {}
+    for bundle, batch_nos in bundle_batches.items():
+        bundle_expiry = {expiry_dates[batch_no] for batch_no in batch_nos if batch_no in expiry_dates}
+        if bundle_expiry:
+            expiry_map[bundle] = list(bundle_expiry)
+
+    return expiry_map
+
+
+def apply_expiry_discount(doc):
+    """Set the expiry based discount on every Sales Invoice row.
+
+    Rows get the highest discount of the batches in their bundle and rows
+    without one are reset to the price list rate, as the "Expiry based
+    discount" server script did. Totals are left to the standard
+    calculate_taxes_and_totals that runs in validate afterwards.
+    """
+    tiers = get_discount_tiers()
+    if not tiers:
+        return
+
+    with Span("expiry_discount.apply", invoice=doc.name) as span:
+        expiry_map = get_bundle_batch_expiry(item.get("serial_and_batch_bundle") for item in doc.items)
+        span.count("rows", len(doc.items))
+        span.count("bundles_resolved", len(expiry_map))
+
+        posting_date = getdate(today())
+        discounted_rows = []
+
+        for item in doc.items:
+            max_discount = 0
+            for expiry_date in expiry_map.get(item.get("serial_and_batch_bundle"), []):
+                max_discount = max(max_discount, get_discount_for_days(date_diff(expiry_date, posting_date), tiers))
+
+            if max_discount > 0:
+                item.discount_percentage = max_discount
+                item.ignore_pricing_rule = 1
+                item.rate = item.price_list_rate * (1 - (max_discount / 100.0))
+                item.discount_amount = item.price_list_rate - item.rate
+                discounted_rows.append(_("Row {0}: Applied {1}% discount for {2}").format(item.idx, max_discount, item.item_code))
+            else:
+                # Do not leave discounts from previous saves behind
+                item.discount_percentage = 0
+                item.discount_amount = 0
+                item.rate = item.price_list_rate
+
+        span.count("discounted_rows", len(discounted_rows))
+
+    if discounted_rows:
+        frappe.msgprint("<br>".join(discounted_rows), title=_("Expiry Based Discount"))
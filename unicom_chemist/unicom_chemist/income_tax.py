@@ -0,0 +1,121 @@
+"""Income tax of the Salary Slip, from date-effective Income Tax Bracket Configs.
+
+Each enabled config is compiled once into an `IncomeTaxTable`: bracket
+thresholds with the tax already due at each of them, so the tax of an
+amount is a bisect plus one multiply-add. The compiled tables are kept in
+process memory and rebuilt on every worker once a saved or deleted config
+is committed.
+"""
+
+from bisect import bisect_right
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+from unicom_chemist.unicom_chemist.cache import get_cached_map, invalidate_cached_map
+
+
+INCOME_TAX_TABLES_KEY = "unicom_chemist:income_tax_tables"
+
+# The rates CustomSalarySlip applied before they were configurable
+DEFAULT_CONFIG = {
+    "effective_from": "2000-01-01",
+    "ssf_rate": 5.5,
+    "pf_rate": 3,
+    "tax_relief": 150,
+    "brackets": [
+        {"from_amount": 490, "rate": 5},
+        {"from_amount": 600, "rate": 10},
+        {"from_amount": 730, "rate": 17.5},
+    ],
+}
+
+
+class IncomeTaxTable:
+    """Compiled brackets and deductions of one Income Tax Bracket Config"""
+
+    def __init__(self, ssf_rate, pf_rate, tax_relief, brackets):
+        """`brackets` is [(from_amount, rate percent)]; amounts below the first bracket are not taxed"""
+        self.deduction_rate = (flt(ssf_rate) + flt(pf_rate)) / 100
+        self.tax_relief = flt(tax_relief)
+
+        self.thresholds = []
+        self.rates = []
+        self.base_taxes = []
+
+        base_tax = 0
+        for from_amount, rate in sorted(brackets):
+            if self.thresholds:
+                base_tax += (from_amount - self.thresholds[-1]) * self.rates[-1]
+            self.thresholds.append(flt(from_amount))
+            self.rates.append(flt(rate) / 100)
+            self.base_taxes.append(base_tax)
+
+    def get_taxable_amount(self, gross_pay):
+        return gross_pay - gross_pay * self.deduction_rate - self.tax_relief
+
+    def get_tax(self, taxable_amount):
+        bracket = bisect_right(self.thresholds, taxable_amount) - 1
+        if bracket < 0:
+            return 0
+
+        return self.base_taxes[bracket] + (taxable_amount - self.thresholds[bracket]) * self.rates[bracket]
+
+    def get_taxes(self, taxable_amounts):
+        """Tax of every amount, e.g. the taxable salaries of a whole payroll"""
+        return [self.get_tax(taxable_amount) for taxable_amount in taxable_amounts]
+
+    def get_tax_for_gross_pay(self, gross_pay):
+        return self.get_tax(self.get_taxable_amount(gross_pay))
+
+
+def load_income_tax_tables():
+    """([effective_from dates], [IncomeTaxTable]) of the enabled configs, sorted by date"""
+    configs = frappe.get_all(
+        "Income Tax Bracket Config",
+        filters={"disabled": 0},
+        fields=["name", "effective_from", "ssf_rate", "pf_rate", "tax_relief"],
+        order_by="effective_from",
+    )
+    if not configs:
+        return [], []
+
+    brackets = {}
+    for row in frappe.get_all(
+        "Income Tax Bracket",
+        filters={"parenttype": "Income Tax Bracket Config", "parent": ("in", [config.name for config in configs])},
+        fields=["parent", "from_amount", "rate"],
+    ):
+        brackets.setdefault(row.parent, []).append((row.from_amount, row.rate))
+
+    return (
+        [getdate(config.effective_from) for config in configs],
+        [
+            IncomeTaxTable(config.ssf_rate, config.pf_rate, config.tax_relief, brackets.get(config.name, []))
+            for config in configs
+        ],
+    )
+
+
+def get_income_tax_table(on_date):
+    """The compiled config in effect on the date"""
+    dates, tables = get_cached_map(INCOME_TAX_TABLES_KEY, load_income_tax_tables)
+
+    index = bisect_right(dates, getdate(on_date)) - 1
+    if index < 0:
+        frappe.throw(_("No Income Tax Bracket Config is effective on {0}").format(on_date))
+
+    return tables[index]
+
+
+def clear_income_tax_cache():
+    invalidate_cached_map(INCOME_TAX_TABLES_KEY)
+
+
+def create_default_config():
+    """Config with the rates CustomSalarySlip used before, so existing payrolls keep their tax"""
+    if frappe.db.count("Income Tax Bracket Config"):
+        return
+
+    frappe.get_doc({"doctype": "Income Tax Bracket Config", **DEFAULT_CONFIG}).insert(ignore_permissions=True)
@@ -0,0 +1,96 @@
+"""Levelled, sampled diagnostics for the app's hot paths.
+
+Everything is off unless switched on in site_config.json:
+
+    "unicom_chemist_debug_level": 1,        # 0 off, 1 one summary line per call, 2 verbose
+    "unicom_chemist_debug_sample_rate": 0.1  # share of calls that are logged (default 1)
+
+Timing counters are always collected (they are cheap) and can be read with `get_stats`.
+"""
+
+import random
+import time
+from collections import defaultdict
+
+import frappe
+from frappe.utils import cint, flt
+
+
+OFF = 0
+SUMMARY = 1
+VERBOSE = 2
+
+_stats = defaultdict(lambda: defaultdict(float))
+
+
+def get_debug_level():
+    # `bench set-config` without -p stores strings
+    return cint(frappe.conf.get("unicom_chemist_debug_level"))
+
+
+def get_logger():
+    return frappe.logger("unicom_chemist")
+
+
+class Span:
+    """Times one call of a hot path and counts the work it did.
+
+    with Span("sales_invoice.fetch_batch_expiry", invoice=self.name) as span:
+        span.count("rows", len(self.items))
+        span.log("resolved {0} bundles", len(expiry_map))
+    """
+
+    def __init__(self, name, **context):
+        self.name = name
+        self.context = context
+        self.counters = defaultdict(int)
+        self.level = get_debug_level()
+        if self.level:
+            sample_rate = frappe.conf.get("unicom_chemist_debug_sample_rate")
+            if sample_rate is not None and random.random() >= flt(sample_rate):
+                self.level = OFF
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ms = (time.perf_counter() - self.start) * 1000
+
+        stats = _stats[self.name]
+        stats["calls"] += 1
+        stats["ms"] += ms
+        for key, value in self.counters.items():
+            stats[key] += value
+
+        if self.level >= SUMMARY:
+            counters = " ".join(f"{key}={value}" for key, value in self.counters.items())
+            get_logger().info(f"{self.name} {self._format_context()} {counters} ms={ms:.1f}")
+
+    def count(self, key, value=1):
+        self.counters[key] += value
+
+    def log(self, message, *args):
+        """Verbose line, only formatted when this call is sampled at VERBOSE level"""
+        if self.level >= VERBOSE:
+            get_logger().debug(f"{self.name} {self._format_context()} {message.format(*args)}")
+
+    def _format_context(self):
+        return " ".join(f"{key}={value}" for key, value in self.context.items())
+
+
+@frappe.whitelist()
+def get_stats():
+    """Call/row/timing counters per span for this worker"""
+    frappe.only_for("System Manager")
+
+    return {
+        name: {**counters, "avg_ms": round(counters["ms"] / counters["calls"], 2)}
+        for name, counters in _stats.items()
+    }
+
+
+@frappe.whitelist()
+def reset_stats():
+    frappe.only_for("System Manager")
+    _stats.clear()
@@ -0,0 +1,172 @@
+# Copyright (c) 2026, Amit Kumar and contributors
+# License: MIT. See LICENSE
+
+"""Background export of the UCL invoice reports to a private CSV or Excel file.
+
+Rows are read through an unbuffered (server-side) cursor and written to the
+file in fixed-size chunks, so memory stays the same however many invoices
+the filters select. The user is notified when the file is ready.
+"""
+
+import csv
+import os
+from itertools import islice
+
+import frappe
+from frappe import _
+from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+from frappe.utils import now_datetime, today
+
+from unicom_chemist.unicom_chemist import invoice_report
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+# Report: is_pos
+REPORTS = {
+	"Sales Invoice Report UCL": 0,
+	"POS Invoice Report UCL": 1,
+}
+
+# Format: file extension
+FILE_FORMATS = {
+	"CSV": "csv",
+	"Excel": "xlsx",
+}
+
+CHUNK_SIZE = 5000
+
+
+@frappe.whitelist()
+def start_invoice_report_export(report_name, filters, file_format="CSV"):
+	"""Queue an export of the whole report; the user is notified when it is ready"""
+	if report_name not in REPORTS:
+		frappe.throw(_("Report {0} cannot be exported in background").format(report_name))
+
+	if not frappe.get_doc("Report", report_name).is_permitted():
+		frappe.throw(_("Not permitted to export {0}").format(report_name), frappe.PermissionError)
+
+	if file_format not in FILE_FORMATS:
+		frappe.throw(_("Unsupported export format: {0}").format(file_format))
+
+	filters = frappe._dict(frappe.parse_json(filters) or {})
+	for key in invoice_report.PAGING_FILTERS:
+		filters.pop(key, None)
+	invoice_report.validate_filters(filters)
+
+	job = frappe.enqueue(
+		export_invoice_report,
+		queue="long",
+		timeout=2 * 60 * 60,
+		report_name=report_name,
+		filters=filters,
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+	return {"job_id": job.id if job else None}
+
+
+def export_invoice_report(report_name, filters, file_format, user):
+	filters = frappe._dict(filters)
+	conditions, params = invoice_report.get_conditions(filters, REPORTS[report_name])
+	params["status_date"] = today()
+	query, params = invoice_report.get_page_query(conditions, params, page_length=None)
+
+	columns = invoice_report.get_columns()
+	# the hash keeps two exports started in the same second apart
+	file_name = "{0}_{1}_{2}.{3}".format(
+		frappe.scrub(report_name),
+		now_datetime().strftime("%Y%m%d_%H%M%S"),
+		frappe.generate_hash(length=6),
+		FILE_FORMATS[file_format],
+	)
+	path = frappe.get_site_path("private", "files", file_name)
+
+	try:
+		with Span("invoice_export.run", report=report_name, format=file_format) as span:
+			writer = XLSXWriter(path, report_name) if file_format == "Excel" else CSVWriter(path)
+			try:
+				writer.write_row([column["label"] for column in columns])
+
+				with frappe.db.unbuffered_cursor():
+					invoices = frappe.db.sql(query, params, as_dict=1, as_iterator=True)
+					while chunk := list(islice(invoices, CHUNK_SIZE)):
+						for invoice in chunk:
+							row = invoice_report.get_row(invoice)
+							writer.write_row([row.get(column["fieldname"]) for column in columns])
+						span.count("rows", len(chunk))
+			finally:
+				writer.close()
+	except Exception:
+		if os.path.exists(path):
+			os.remove(path)
+		frappe.log_error(title=_("Export of {0} failed").format(report_name))
+		frappe.publish_realtime(
+			"invoice_report_export", {"report_name": report_name, "failed": 1}, user=user
+		)
+		raise
+
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"file_size": os.path.getsize(path),
+			"is_private": 1,
+		}
+	)
+	file_doc.flags.ignore_permissions = True
+	file_doc.insert()
+	frappe.db.commit()
+
+	notify(user, report_name, file_doc)
+
+
+def notify(user, report_name, file_doc):
+	enqueue_create_notification(
+		user,
+		{
+			"type": "Alert",
+			"document_type": "File",
+			"document_name": file_doc.name,
+			"subject": _("Export of {0} is ready: {1}").format(report_name, file_doc.file_name),
+			"from_user": user,
+		},
+	)
+	frappe.publish_realtime(
+		"invoice_report_export",
+		{"report_name": report_name, "file_url": file_doc.file_url, "file_name": file_doc.file_name},
+		user=user,
+	)
+
+
+class CSVWriter:
+	def __init__(self, path):
+		self.file = open(path, "w", newline="", encoding="utf-8")
+		self.writer = csv.writer(self.file)
+
+	def write_row(self, row):
+		self.writer.writerow(row)
+
+	def close(self):
+		self.file.close()
+
+
+class XLSXWriter:
+	"""openpyxl in write-only mode, which streams rows to disk instead of keeping the sheet.
+
+	The rows go to a temporary file that openpyxl only removes on save, so `close`
+	saves even when the export failed; the partial file is deleted afterwards.
+	"""
+
+	def __init__(self, path, sheet_name):
+		from openpyxl import Workbook
+
+		self.path = path
+		self.workbook = Workbook(write_only=True)
+		self.sheet = self.workbook.create_sheet(sheet_name[:31])
+
+	def write_row(self, row):
+		self.sheet.append(row)
+
+	def close(self):
+		self.workbook.save(self.path)
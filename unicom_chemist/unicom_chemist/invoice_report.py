@@ -0,0 +1,413 @@
+# Copyright (c) 2025, Amit Kumar and contributors
+# License: MIT. See LICENSE
+
+"""Shared engine of the Sales Invoice Report UCL and POS Invoice Report UCL.
+
+Both reports differ only in `is_pos`. Rows are returned one page at a time,
+paged with a keyset on (posting_date, creation, name) so deep pages cost the
+same as the first one. Paid/Overdue/Unpaid is derived in SQL, and the total,
+report summary and chart come from one GROUP BY query over branch and status.
+
+Results are cached in Redis per company and branch filter, keyed by a hash of
+the normalized filters, and evicted when an invoice or payment of that
+company and branch is submitted, cancelled or updated after submit, once
+that change is committed.
+"""
+
+import hashlib
+import json
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import (
+	cint,
+	flt,
+	format_datetime,
+	get_datetime,
+	now_datetime,
+	time_diff_in_seconds,
+	today,
+)
+
+from unicom_chemist.unicom_chemist.doctype.invoice_name_index.invoice_name_index import (
+	get_invoice_id_condition,
+)
+
+
+DEFAULT_PAGE_LENGTH = 500
+MAX_PAGE_LENGTH = 5000
+
+CACHE_KEY = "unicom_chemist:invoice_report"
+CACHE_TTL = 15 * 60
+
+# Filters that select a page rather than the invoices
+PAGING_FILTERS = ("cursor", "page_length")
+
+# Status of the report, as of %(status_date)s
+STATUS_SQL = """CASE
+	WHEN si.outstanding_amount <= 0 THEN 'Paid'
+	WHEN si.due_date < %(status_date)s THEN 'Overdue'
+	ELSE 'Unpaid'
+END"""
+
+STATUS_INDICATORS = {"Paid": "Green", "Unpaid": "Blue", "Overdue": "Red"}
+
+
+def execute_invoice_report(filters, is_pos):
+	filters = frappe._dict(filters or {})
+
+	validate_filters(filters)
+	columns = get_columns()
+
+	result = get_cached_result(filters, is_pos)
+	if not result:
+		result = get_result(filters, is_pos)
+		set_cached_result(filters, is_pos, result)
+
+	total = sum(row.count for row in result["totals"])
+	message = _("Showing {0} of {1} invoices, computed at {2}").format(
+		len(result["data"]), total, format_datetime(result["computed_at"])
+	)
+	currency = frappe.get_cached_value("Company", filters.company, "default_currency")
+
+	return (
+		columns,
+		result["data"],
+		message,
+		get_chart(result["totals"], currency),
+		get_report_summary(result["totals"], currency),
+	)
+
+
+def get_result(filters, is_pos):
+	conditions, params = get_conditions(filters, is_pos)
+	params["status_date"] = today()
+
+	page_length = min(cint(filters.page_length) or DEFAULT_PAGE_LENGTH, MAX_PAGE_LENGTH)
+	invoices = get_page(conditions, params, get_cursor(filters), page_length)
+
+	return {
+		"data": [get_row(invoice) for invoice in invoices],
+		"totals": get_totals(conditions, params),
+		"computed_at": now_datetime(),
+	}
+
+
+def validate_filters(filters):
+	if not filters.get("company"):
+		frappe.throw(_("Company is required"))
+
+
+def get_columns():
+	return [
+		{
+			"label": _("Invoice ID"),
+			"fieldname": "name",
+			"fieldtype": "Link",
+			"options": "Sales Invoice",
+			"width": 140
+		},
+		{
+			"label": _("Customer"),
+			"fieldname": "customer_name",
+			"fieldtype": "Data",
+			"width": 150
+		},
+		{
+			"label": _("Branch"),
+			"fieldname": "branch",
+			"fieldtype": "Link",
+			"options": "Branch",
+			"width": 120
+		},
+		{
+			"label": _("Status"),
+			"fieldname": "status",
+			"fieldtype": "Data",
+			"width": 100
+		},
+		{
+			"label": _("Due Date"),
+			"fieldname": "due_date",
+			"fieldtype": "Date",
+			"width": 100
+		},
+		{
+			"label": _("Grand Total"),
+			"fieldname": "grand_total",
+			"fieldtype": "Currency",
+			"options": "currency",
+			"width": 120
+		},
+		{
+			"label": _("Outstanding Amount"),
+			"fieldname": "outstanding_amount",
+			"fieldtype": "Currency",
+			"options": "currency",
+			"width": 140
+		}
+	]
+
+
+def get_conditions(filters, is_pos):
+	"""WHERE clause and params shared by the page and count queries"""
+	conditions = ["si.docstatus = 1", "si.company = %(company)s", "si.is_pos = %(is_pos)s"]
+	params = {"company": filters.get("company"), "is_pos": cint(is_pos)}
+
+	# Apply invoice ID filter
+	if filters.get("invoice_id"):
+		condition, invoice_id_params = get_invoice_id_condition(filters.invoice_id)
+		conditions.append(condition)
+		params.update(invoice_id_params)
+
+	# Apply customer filter
+	if filters.get("customer"):
+		conditions.append("si.customer = %(customer)s")
+		params["customer"] = filters.customer
+
+	# Apply branch filter
+	if filters.get("branch"):
+		conditions.append("si.branch = %(branch)s")
+		params["branch"] = filters.branch
+
+	# Apply date range filter
+	if filters.get("from_date"):
+		conditions.append("si.posting_date >= %(from_date)s")
+		params["from_date"] = filters.from_date
+
+	if filters.get("to_date"):
+		conditions.append("si.posting_date <= %(to_date)s")
+		params["to_date"] = filters.to_date
+
+	# Apply status filter
+	if filters.get("status"):
+		conditions.append("si.status = %(status)s")
+		params["status"] = filters.status
+
+	return conditions, params
+
+
+def get_cursor(filters):
+	"""(posting_date, creation, name) of the last row of the previous page, or None.
+
+	The cursor carries the filters it was made for and is ignored once they
+	change, so changing a filter always starts again from the first page.
+	"""
+	if not filters.get("cursor"):
+		return None
+
+	try:
+		cursor = json.loads(filters.cursor)
+	except ValueError:
+		return None
+
+	current_filters = {key: value for key, value in filters.items() if key not in PAGING_FILTERS and value}
+	if cursor.get("filters") != current_filters or len(cursor.get("key") or []) != 3:
+		return None
+
+	return cursor["key"]
+
+
+def get_page(conditions, params, cursor, page_length):
+	query, params = get_page_query(conditions, params, cursor, page_length)
+	return frappe.db.sql(query, params, as_dict=1)
+
+
+def get_page_query(conditions, params, cursor=None, page_length=DEFAULT_PAGE_LENGTH):
+	"""Page query and params; `page_length=None` selects every row, for exports"""
+	conditions = list(conditions)
+	params = dict(params, page_length=page_length)
+
+	if cursor:
+		conditions.append(
+			"""(
+				si.posting_date < %(cursor_date)s
+				OR (si.posting_date = %(cursor_date)s AND (
+					si.creation < %(cursor_creation)s
+					OR (si.creation = %(cursor_creation)s AND si.name < %(cursor_name)s)
+				))
+			)"""
+		)
+		params.update(cursor_date=cursor[0], cursor_creation=cursor[1], cursor_name=cursor[2])
+
+	query = f"""
+		SELECT
+			si.name,
+			si.customer,
+			si.customer_name,
+			si.posting_date,
+			si.creation,
+			si.due_date,
+			si.grand_total,
+			si.outstanding_amount,
+			{STATUS_SQL} AS status,
+			si.currency,
+			si.docstatus,
+			si.branch
+		FROM `tabSales Invoice` si
+		WHERE {" AND ".join(conditions)}
+		ORDER BY si.posting_date DESC, si.creation DESC, si.name DESC
+		{"LIMIT %(page_length)s" if page_length else ""}
+	"""
+	return query, params
+
+
+def get_totals(conditions, params):
+	"""Invoice count, grand total and outstanding per branch and status"""
+	return frappe.db.sql(*get_totals_query(conditions, params), as_dict=1)
+
+
+def get_totals_query(conditions, params):
+	return (
+		f"""
+		SELECT
+			IFNULL(si.branch, '') AS branch,
+			{STATUS_SQL} AS status,
+			COUNT(*) AS count,
+			SUM(si.grand_total) AS grand_total,
+			SUM(si.outstanding_amount) AS outstanding_amount
+		FROM `tabSales Invoice` si
+		WHERE {" AND ".join(conditions)}
+		GROUP BY branch, status
+		""",
+		params,
+	)
+
+
+def get_report_summary(totals, currency):
+	summary = [
+		{
+			"value": sum(row.count for row in totals),
+			"label": _("Invoices"),
+			"datatype": "Int",
+		},
+		{
+			"value": sum(flt(row.grand_total) for row in totals),
+			"label": _("Grand Total"),
+			"datatype": "Currency",
+			"currency": currency,
+		},
+		{
+			"value": sum(flt(row.outstanding_amount) for row in totals),
+			"label": _("Outstanding Amount"),
+			"datatype": "Currency",
+			"currency": currency,
+			"indicator": "Red",
+		},
+	]
+
+	for status, indicator in STATUS_INDICATORS.items():
+		summary.append(
+			{
+				"value": sum(row.count for row in totals if row.status == status),
+				"label": _(status),
+				"datatype": "Int",
+				"indicator": indicator,
+			}
+		)
+
+	return summary
+
+
+def get_chart(totals, currency):
+	"""Grand total per branch, stacked by status"""
+	branches = sorted({row.branch for row in totals})
+	amounts = {(row.branch, row.status): flt(row.grand_total, 2) for row in totals}
+
+	return {
+		"data": {
+			"labels": [branch or _("Not Set") for branch in branches],
+			"datasets": [
+				{"name": _(status), "values": [amounts.get((branch, status), 0) for branch in branches]}
+				for status in STATUS_INDICATORS
+			],
+		},
+		"type": "bar",
+		"barOptions": {"stacked": 1},
+		"colors": ["#29CD42", "#5E64FF", "#FF5858"],
+		"fieldtype": "Currency",
+		"options": currency,
+	}
+
+
+def get_row(invoice):
+	return {
+		"name": invoice.name,
+		"customer": invoice.customer,
+		"customer_name": invoice.customer_name or invoice.customer,
+		"posting_date": invoice.posting_date,
+		"creation": invoice.creation,
+		"due_date": invoice.due_date,
+		"grand_total": flt(invoice.grand_total, 2),
+		"outstanding_amount": flt(invoice.outstanding_amount, 2),
+		"status": invoice.status,
+		"currency": invoice.currency,
+		"branch": invoice.get("branch") or ""
+	}
+
+
+def get_cache_name(company, branch):
+	"""Redis hash holding the cached results of one company and branch filter ("" for all branches)"""
+	return f"{CACHE_KEY}:{company}:{branch or ''}"
+
+
+def get_filters_hash(filters, is_pos):
+	"""Hash of the filters with empty values dropped, so equivalent filter sets share an entry.
+
+	Today's date is part of it because the Overdue status depends on it.
+	"""
+	normalized = {key: str(value).strip() for key, value in filters.items() if value not in (None, "")}
+	payload = json.dumps([normalized, cint(is_pos), today()], sort_keys=True)
+	return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def get_cached_result(filters, is_pos):
+	result = frappe.cache.hget(get_cache_name(filters.company, filters.branch), get_filters_hash(filters, is_pos))
+	if not result or time_diff_in_seconds(now_datetime(), get_datetime(result["computed_at"])) > CACHE_TTL:
+		return None
+
+	return result
+
+
+def set_cached_result(filters, is_pos, result):
+	name = get_cache_name(filters.company, filters.branch)
+	frappe.cache.hset(name, get_filters_hash(filters, is_pos), result)
+	# Entries carry their own age; this only drops hashes nobody reads anymore
+	frappe.cache.expire(frappe.cache.make_key(name), CACHE_TTL)
+
+
+def clear_cached_results(company, branches):
+	"""Evict the results of the given branches and of reports not filtered by branch"""
+	for branch in {"", *branches}:
+		frappe.cache.delete_value(get_cache_name(company, branch))
+
+
+def clear_cached_results_after_commit(company, branches):
+	"""Evict once the change is committed, so a report running meanwhile cannot cache the old totals again"""
+	frappe.db.after_commit.add(partial(clear_cached_results, company, branches))
+
+
+def on_invoice_change(doc, method=None):
+	"""doc_events handler for Sales Invoice on_submit / on_cancel / on_update_after_submit"""
+	branches = {doc.get("branch")}
+	if doc_before_save := doc.get_doc_before_save():
+		branches.add(doc_before_save.get("branch"))
+
+	clear_cached_results_after_commit(doc.company, {branch for branch in branches if branch})
+
+
+def on_payment_entry_change(doc, method=None):
+	"""doc_events handler for Payment Entry: outstanding amounts of the paid invoices change"""
+	invoices = {
+		reference.reference_name
+		for reference in doc.get("references") or []
+		if reference.reference_doctype == "Sales Invoice" and reference.reference_name
+	}
+	if not invoices:
+		return
+
+	branches = frappe.get_all(
+		"Sales Invoice", filters={"name": ("in", list(invoices))}, pluck="branch", distinct=True
+	)
+	clear_cached_results_after_commit(doc.company, {branch for branch in branches if branch})
@@ -0,0 +1,145 @@
+"""Bulk Item onboarding from a supplier catalogue (CSV/XLSX).
+
+Rows are inserted by a background job in chunks. Item group prefixes are
+resolved once per chunk, barcodes are reserved for the whole chunk in one
+allocation, and every chunk is committed on its own so a bad row only
+loses itself.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+from frappe.utils.csvutils import read_csv_content
+from frappe.utils.xlsxutils import read_xlsx_file_from_attached_file
+
+from unicom_chemist.unicom_chemist.barcode import allocate_barcodes
+from unicom_chemist.unicom_chemist.instrumentation import Span
+from unicom_chemist.unicom_chemist.naming import get_item_group_name_map, get_item_prefix
+
+
+REQUIRED_COLUMNS = ("item_code", "item_name", "item_group", "stock_uom")
+DEFAULT_CHUNK_SIZE = 500
+
+
+@frappe.whitelist()
+def start_item_import(file_url, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Queue the import of an attached CSV/XLSX file; progress is pushed as `item_import_progress`"""
+    frappe.only_for(("System Manager", "Item Manager", "Stock Manager"))
+
+    rows = read_rows(file_url)
+    validate_columns(rows)
+
+    job = frappe.enqueue(
+        run_item_import,
+        queue="long",
+        timeout=4 * 60 * 60,
+        file_url=file_url,
+        chunk_size=cint(chunk_size) or DEFAULT_CHUNK_SIZE,
+        user=frappe.session.user,
+    )
+    return {"job_id": job.id if job else None, "rows": len(rows) - 1}
+
+
+def read_rows(file_url):
+    """Header row followed by data rows, as lists"""
+    if file_url.lower().endswith(".xlsx"):
+        rows = read_xlsx_file_from_attached_file(file_url=file_url)
+    else:
+        content = frappe.get_doc("File", {"file_url": file_url}).get_content()
+        rows = read_csv_content(content)
+
+    return [row for row in rows if any(cell not in (None, "") for cell in row)]
+
+
+def validate_columns(rows):
+    if not rows:
+        frappe.throw(_("The file is empty"))
+
+    header = [frappe.scrub(str(column or "")) for column in rows[0]]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        frappe.throw(_("Missing columns: {0}").format(", ".join(missing)))
+
+    return header
+
+
+def run_item_import(file_url, chunk_size=DEFAULT_CHUNK_SIZE, user=None):
+    rows = read_rows(file_url)
+    header = validate_columns(rows)
+    records = [dict(zip(header, row)) for row in rows[1:]]
+
+    item_fields = {df.fieldname for df in frappe.get_meta("Item").fields}
+    imported, failed = 0, []
+
+    with Span("item_import.run", file=file_url) as span:
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start : start + chunk_size]
+            chunk_imported, chunk_failed = import_chunk(chunk, start, item_fields)
+            imported += chunk_imported
+            failed.extend(chunk_failed)
+            frappe.db.commit()
+
+            frappe.publish_realtime(
+                "item_import_progress",
+                {
+                    "file_url": file_url,
+                    "processed": start + len(chunk),
+                    "total": len(records),
+                    "imported": imported,
+                    "failed": len(failed),
+                },
+                user=user,
+            )
+
+        span.count("rows", len(records))
+        span.count("imported", imported)
+        span.count("failed", len(failed))
+
+    if failed:
+        frappe.log_error(
+            title=_("Item import: {0} rows failed").format(len(failed)),
+            message="\n".join(f"Row {row}: {error}" for row, error in failed),
+        )
+
+    frappe.publish_realtime(
+        "item_import_progress",
+        {"file_url": file_url, "done": 1, "total": len(records), "imported": imported, "failed": len(failed)},
+        user=user,
+    )
+
+
+def import_chunk(records, offset, item_fields):
+    """Insert one chunk of Items, returns (imported count, [(row number, error)])"""
+    item_group_names = get_item_group_name_map()
+    prefixes = {}
+
+    # Barcodes for the whole chunk are reserved in one allocation
+    without_barcode = sum(1 for record in records if not record.get("barcode"))
+    barcodes = iter(allocate_barcodes(without_barcode) if without_barcode else [])
+
+    imported, failed = 0, []
+    for idx, record in enumerate(records, start=offset + 2):
+        item_group = record.get("item_group")
+        if item_group not in prefixes and item_group_names.get(item_group):
+            prefixes[item_group] = get_item_prefix(item_group_names[item_group])
+
+        barcode = record.get("barcode") or next(barcodes)
+
+        item = frappe.new_doc("Item")
+        item.update({key: value for key, value in record.items() if key in item_fields and value not in (None, "")})
+        if item_group in prefixes:
+            item.naming_series = f"{prefixes[item_group]}-.####"
+        item.append("barcodes", {"barcode": str(barcode), "uom": item.stock_uom})
+        # Skips the per-row lookups of the naming hook
+        item.flags.in_import = True
+
+        frappe.db.savepoint("item_import_row")
+        try:
+            item.insert()
+            imported += 1
+        except Exception as e:
+            frappe.db.rollback(save_point="item_import_row")
+            frappe.clear_last_message()
+            failed.append((idx, str(e)))
+
+    return imported, failed
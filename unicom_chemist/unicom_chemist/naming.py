@@ -0,0 +1,167 @@
+"""Branch-wise naming series, set on Before Insert through doc_events.
+
+Replaces the per-doctype "... Naming Series" server scripts. Branch
+abbreviations, POS Profile branches and Item Group names are read from
+process-wide maps that are invalidated when those masters change.
+"""
+
+import frappe
+from frappe import _
+
+from unicom_chemist.unicom_chemist.cache import get_cached_map, invalidate_cached_map
+from unicom_chemist.unicom_chemist.warehouse_branch import get_warehouse_branches
+
+
+BRANCH_ABBR_KEY = "unicom_chemist:branch_abbr"
+POS_PROFILE_BRANCH_KEY = "unicom_chemist:pos_profile_branch"
+ITEM_GROUP_NAME_KEY = "unicom_chemist:item_group_name"
+
+# doctype: (prefix, series pattern after "<prefix>-<abbr>-", branch field)
+NAMING_RULES = {
+    "Sales Invoice": ("SI", ".YY.-.##", "branch"),
+    "POS Invoice": ("POS", ".YY.-.##", "branch"),
+    "Sales Order": ("SO", ".YY.-.##", "branch"),
+    "Quotation": ("QU", ".DD.-.MM.-.YY.-.##", "custom_branch"),
+    "Purchase Order": ("PO", ".DD.-.MM.-.YY.-.##", "branch"),
+    "Purchase Receipt": ("PU", ".DD.-.MM.-.YY.-.##", "branch"),
+    "Purchase Invoice": ("PINV", ".YY.-.##", "branch"),
+    "Material Request": ("MR", ".YY.-.##", None),
+    "Stock Entry": (None, ".YY.-.##", None),
+}
+
+# Stock Entry types that are named branch-wise, by the branch of their target warehouses
+STOCK_ENTRY_PREFIXES = {
+    "Material Transfer": "MT",
+    "Material Receipt": "MRE",
+}
+
+
+def get_branch_abbr_map():
+    return get_cached_map(
+        BRANCH_ABBR_KEY,
+        lambda: dict(frappe.get_all("Branch", fields=["name", "custom_abbr"], as_list=True)),
+    )
+
+
+def get_pos_profile_branch_map():
+    return get_cached_map(
+        POS_PROFILE_BRANCH_KEY,
+        lambda: dict(frappe.get_all("POS Profile", fields=["name", "branch"], as_list=True)),
+    )
+
+
+def get_item_group_name_map():
+    return get_cached_map(
+        ITEM_GROUP_NAME_KEY,
+        lambda: dict(frappe.get_all("Item Group", fields=["name", "item_group_name"], as_list=True)),
+    )
+
+
+def get_branch_abbr(branch):
+    branch_abbr = get_branch_abbr_map().get(branch)
+    if not branch_abbr:
+        frappe.throw(
+            _("Branch abbreviation (custom_abbr) is missing for Branch: {0}. Please configure it first.").format(branch)
+        )
+
+    return branch_abbr
+
+
+def set_naming_series(doc, method=None):
+    """doc_events Before Insert handler for the doctypes in NAMING_RULES"""
+    prefix, pattern, branch_field = NAMING_RULES[doc.doctype]
+
+    if doc.doctype == "Stock Entry":
+        prefix = STOCK_ENTRY_PREFIXES.get(doc.stock_entry_type)
+        if not prefix:
+            return
+        branch = get_stock_entry_branch(doc)
+        # Set Branch on Stock Entry (recommended)
+        doc.branch = branch
+    elif doc.doctype == "Material Request":
+        branch = get_material_request_branch(doc)
+    else:
+        branch = doc.get(branch_field)
+        # If branch is coming from POS Profile
+        if not branch and doc.doctype == "POS Invoice" and doc.pos_profile:
+            branch = get_pos_profile_branch_map().get(doc.pos_profile)
+
+    if not branch:
+        frappe.throw(_("Branch is mandatory for {0}").format(_(doc.doctype)))
+
+    doc.naming_series = f"{prefix}-{get_branch_abbr(branch)}-{pattern}"
+
+
+def get_material_request_branch(doc):
+    branches = {item.branch for item in doc.items if item.branch}
+
+    if not branches:
+        frappe.throw(_("Branch is mandatory in Material Request Items (Accounting Dimension)."))
+
+    if len(branches) > 1:
+        frappe.throw(_("All items in a Material Request must belong to the same Branch."))
+
+    return branches.pop()
+
+
+def get_stock_entry_branch(doc):
+    warehouses = set()
+    for item in doc.items:
+        if not item.t_warehouse:
+            frappe.throw(_("Target Warehouse is mandatory in {0} Items.").format(_(doc.stock_entry_type)))
+        warehouses.add(item.t_warehouse)
+
+    branches = set()
+    for warehouse, branch in get_warehouse_branches(warehouses).items():
+        if not branch:
+            frappe.throw(_("Branch is not set in Target Warehouse: {0}").format(warehouse))
+        branches.add(branch)
+
+    if not branches:
+        frappe.throw(_("Branch could not be determined from Target Warehouses."))
+
+    if len(branches) > 1:
+        frappe.throw(
+            _("All items in a {0} must belong to the same Branch (based on Target Warehouse).").format(
+                _(doc.stock_entry_type)
+            )
+        )
+
+    return branches.pop()
+
+
+def set_item_naming_series(doc, method=None):
+    """doc_events Before Insert handler for Item: series from the Item Group name"""
+    # Bulk imports resolve the series once per chunk
+    if doc.flags.in_import and doc.naming_series:
+        return
+
+    if not doc.item_group:
+        frappe.throw(_("Item Group is required"))
+
+    item_group_name = get_item_group_name_map().get(doc.item_group)
+    if not item_group_name:
+        frappe.throw(_("Item Group not found"))
+
+    doc.naming_series = f"{get_item_prefix(item_group_name)}-.####"
+
+
+def get_item_prefix(item_group_name):
+    parts = item_group_name.split("-")
+
+    if len(parts) >= 2:
+        return f"{parts[0].strip()[:3].upper()}-{parts[1].strip()[:3].upper()}"
+
+    return item_group_name[:6].upper().replace(" ", "").replace("-", "")
+
+
+def clear_branch_cache(doc=None, method=None):
+    invalidate_cached_map(BRANCH_ABBR_KEY)
+
+
+def clear_pos_profile_cache(doc=None, method=None):
+    invalidate_cached_map(POS_PROFILE_BRANCH_KEY)
+
+
+def clear_item_group_cache(doc=None, method=None):
+    invalidate_cached_map(ITEM_GROUP_NAME_KEY)
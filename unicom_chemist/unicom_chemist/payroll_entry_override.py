@@ -0,0 +1,260 @@
+"""Bulk payroll mode of Payroll Entry.
+
+With Bulk Payroll Mode checked, creating and submitting Salary Slips is
+split into chunks of `CHUNK_SIZE` employees, each run by its own background
+job so that the workers of the long queue process them in parallel. A chunk
+loads the tax config its slips share once, keeps going past a failing slip,
+leaves slips with a negative net pay in draft as the standard submission
+does, and reports its progress. The last chunk to finish completes the
+Payroll Entry: its status and failures and, after submission, the accrual
+Journal Entry and the emails of the slips the run submitted.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import create_batch, getdate
+from hrms.payroll.doctype.payroll_entry.payroll_entry import PayrollEntry, get_existing_salary_slips
+
+from unicom_chemist.unicom_chemist.income_tax import get_income_tax_table
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+CHUNK_SIZE = 50
+CHUNK_TIMEOUT = 30 * 60
+
+RUNS_KEY = "unicom_chemist:payroll_run"
+RUN_TTL = 24 * 60 * 60
+
+PROGRESS_EVENT = "unicom_chemist_payroll_progress"
+
+# action: (label, flag set on success, realtime event the Payroll Entry form reloads on)
+ACTIONS = {
+    "create": ("Salary Slip creation", "salary_slips_created", "completed_salary_slip_creation"),
+    "submit": ("Salary Slip submission", "salary_slips_submitted", "completed_salary_slip_submission"),
+}
+
+# Failures listed in the Payroll Entry's error message, the rest are in the Error Log
+MAX_REPORTED_FAILURES = 20
+
+
+class CustomPayrollEntry(PayrollEntry):
+    """Payroll Entry with Bulk Payroll Mode"""
+
+    @frappe.whitelist()
+    def create_salary_slips(self):
+        if not self.get("custom_bulk_payroll"):
+            return super().create_salary_slips()
+
+        self.check_permission("write")
+        employees = [row.employee for row in self.employees]
+        existing = set(get_existing_salary_slips(employees, get_salary_slip_args(self)))
+        queue_payroll_run(self, "create", [employee for employee in employees if employee not in existing])
+
+    @frappe.whitelist()
+    def submit_salary_slips(self):
+        if not self.get("custom_bulk_payroll"):
+            return super().submit_salary_slips()
+
+        self.check_permission("write")
+        queue_payroll_run(self, "submit", [row[0] for row in self.get_sal_slip_list(ss_status=0)])
+
+
+def get_salary_slip_args(payroll_entry):
+    """Fields of the Salary Slips of the Payroll Entry, as the standard creation sets them"""
+    return frappe._dict(
+        doctype="Salary Slip",
+        salary_slip_based_on_timesheet=payroll_entry.salary_slip_based_on_timesheet,
+        payroll_frequency=payroll_entry.payroll_frequency,
+        start_date=payroll_entry.start_date,
+        end_date=payroll_entry.end_date,
+        company=payroll_entry.company,
+        posting_date=payroll_entry.posting_date,
+        deduct_tax_for_unclaimed_employee_benefits=payroll_entry.get("deduct_tax_for_unclaimed_employee_benefits"),
+        deduct_tax_for_unsubmitted_tax_exemption_proof=payroll_entry.get(
+            "deduct_tax_for_unsubmitted_tax_exemption_proof"
+        ),
+        payroll_entry=payroll_entry.name,
+        exchange_rate=payroll_entry.get("exchange_rate"),
+        currency=payroll_entry.get("currency"),
+    )
+
+
+def get_run_key(payroll_entry, action):
+    return f"{RUNS_KEY}:{payroll_entry}:{action}"
+
+
+def queue_payroll_run(payroll_entry, action, names):
+    """Queue one job per chunk of employees (create) or Salary Slips (submit)"""
+    if not names:
+        if action == "create":
+            payroll_entry.db_set({"status": "Submitted", "salary_slips_created": 1, "error_message": ""})
+        frappe.msgprint(_("There are no Salary Slips to process"))
+        return
+
+    chunks = list(create_batch(names, CHUNK_SIZE))
+    run_key = get_run_key(payroll_entry.name, action)
+    frappe.cache.delete_value([run_key, f"{run_key}:finished"])
+
+    payroll_entry.db_set({"status": "Queued", "error_message": ""})
+    for chunk_index, chunk in enumerate(chunks):
+        frappe.enqueue(
+            process_payroll_chunk,
+            queue="long",
+            timeout=CHUNK_TIMEOUT,
+            enqueue_after_commit=True,
+            job_id=f"payroll_run::{frappe.local.site}::{payroll_entry.name}::{action}::{chunk_index}",
+            deduplicate=True,
+            payroll_entry=payroll_entry.name,
+            action=action,
+            chunk_index=chunk_index,
+            chunks=len(chunks),
+            names=chunk,
+        )
+
+    frappe.msgprint(
+        _("{0} Salary Slips are queued in {1} parallel jobs. It may take a few minutes").format(
+            len(names), len(chunks)
+        ),
+        alert=True,
+        indicator="blue",
+    )
+
+
+def process_payroll_chunk(payroll_entry, action, chunk_index, chunks, names):
+    doc = frappe.get_doc("Payroll Entry", payroll_entry)
+    label = _(ACTIONS[action][0])
+    done, failed, skipped = [], [], []
+
+    # Slips are emailed by complete_payroll_run, not one by one on submit
+    frappe.flags.via_payroll_entry = True
+
+    with Span("payroll_entry.chunk", payroll_entry=payroll_entry, action=action, chunk=chunk_index) as span:
+        try:
+            load_shared_inputs(doc)
+        except Exception as e:
+            # The chunk still reports, so the run completes and shows the failure
+            failed = [(name, str(e)) for name in names]
+            frappe.log_error(title=_("Payroll Entry {0}: {1} failed").format(payroll_entry, label))
+            names = []
+
+        for name in names:
+            frappe.db.savepoint("payroll_slip")
+            try:
+                if action == "create":
+                    done.append(create_salary_slip(doc, name))
+                elif submit_salary_slip(name):
+                    done.append(name)
+                else:
+                    skipped.append(name)
+            except Exception as e:
+                frappe.db.rollback(save_point="payroll_slip")
+                failed.append((name, str(e)))
+                frappe.log_error(
+                    title=_("Payroll Entry {0}: {1} failed for {2}").format(payroll_entry, label, name)
+                )
+
+        frappe.db.commit()
+        span.count("slips", len(done))
+        span.count("failed", len(failed))
+        span.count("skipped", len(skipped))
+
+    finished = report_chunk(doc, action, chunk_index, chunks, done, failed, skipped)
+    if finished == chunks:
+        complete_payroll_run(doc, action)
+
+
+def load_shared_inputs(payroll_entry):
+    """Resolve the tax config all slips of the chunk use, once"""
+    # CustomSalarySlip takes the table from here instead of resolving it per slip
+    frappe.flags.payroll_shared_inputs = frappe._dict(
+        start_date=getdate(payroll_entry.start_date),
+        income_tax_table=get_income_tax_table(payroll_entry.start_date),
+    )
+
+
+def create_salary_slip(payroll_entry, employee):
+    slip = frappe.get_doc({**get_salary_slip_args(payroll_entry), "employee": employee})
+    slip.insert()
+    return slip.name
+
+
+def submit_salary_slip(name):
+    """Submit the slip; a slip with a negative net pay is left in draft and False returned"""
+    slip = frappe.get_doc("Salary Slip", name)
+    if slip.net_pay < 0:
+        return False
+
+    slip.submit()
+    return True
+
+
+def report_chunk(payroll_entry, action, chunk_index, chunks, done, failed, skipped=()):
+    """Store and publish the chunk's result; returns how many chunks of the run have finished"""
+    run_key = get_run_key(payroll_entry.name, action)
+    frappe.cache.hset(run_key, str(chunk_index), {"done": done, "failed": failed, "skipped": list(skipped)})
+    frappe.cache.expire(frappe.cache.make_key(run_key), RUN_TTL)
+
+    # Atomic, so exactly one chunk sees the last count
+    finished_key = frappe.cache.make_key(f"{run_key}:finished")
+    finished = frappe.cache.incr(finished_key)
+    frappe.cache.expire(finished_key, RUN_TTL)
+
+    frappe.publish_realtime(
+        PROGRESS_EVENT,
+        {
+            "payroll_entry": payroll_entry.name,
+            "action": action,
+            "chunk": chunk_index,
+            "chunks": chunks,
+            "finished": finished,
+            "done": len(done),
+            "failed": [name for name, error in failed],
+            "skipped": list(skipped),
+        },
+        user=frappe.session.user,
+    )
+    return finished
+
+
+def complete_payroll_run(payroll_entry, action):
+    """Run by the last chunk to finish: set the Payroll Entry's status, post the accrual after submission"""
+    results = frappe.cache.hgetall(get_run_key(payroll_entry.name, action)).values()
+    done = [name for result in results for name in result["done"]]
+    failed = [failure for result in results for failure in result["failed"]]
+    skipped = [name for result in results for name in result["skipped"]]
+    label, flag, event = ACTIONS[action]
+
+    try:
+        if action == "submit" and done:
+            # The slips this run submitted get their accrual and emails even if others failed,
+            # as in the standard submission; the failed ones stay in draft to be submitted again
+            submitted = [frappe.get_doc("Salary Slip", name) for name in done]
+            payroll_entry.make_accrual_jv_entry(submitted)
+            payroll_entry.email_salary_slip(submitted)
+
+        if failed:
+            payroll_entry.db_set({"status": "Failed", "error_message": get_failure_message(label, failed)})
+        else:
+            payroll_entry.db_set({"status": "Submitted", flag: 1, "error_message": ""})
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        payroll_entry.db_set({"status": "Failed", "error_message": str(e)})
+        frappe.db.commit()
+        frappe.log_error(title=_("Payroll Entry {0}: {1} failed").format(payroll_entry.name, _(label)))
+    finally:
+        if skipped:
+            frappe.publish_realtime(
+                "msgprint",
+                _("Could not submit some Salary Slips due to negative net pay: {0}").format(", ".join(skipped)),
+                user=frappe.session.user,
+            )
+        frappe.publish_realtime(event, user=frappe.session.user)
+
+
+def get_failure_message(label, failed):
+    lines = [f"{name}: {error}" for name, error in failed[:MAX_REPORTED_FAILURES]]
+    if len(failed) > MAX_REPORTED_FAILURES:
+        lines.append(_("... and {0} more, see the Error Log").format(len(failed) - MAX_REPORTED_FAILURES))
+
+    return _("{0} failed for {1} Salary Slips:").format(_(label), len(failed)) + "\n" + "\n".join(lines)
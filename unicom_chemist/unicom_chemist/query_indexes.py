@@ -0,0 +1,203 @@
+"""Composite indexes for the UCL report and dashboard access paths, and an EXPLAIN check for them.
+
+`ensure_indexes` is run by the add_ucl_report_indexes patch. `check_query_plans`
+EXPLAINs the queries of the reports and dashboards, built by their own query
+builders, and reports the plans that do not consider the index added for
+them, or that scan a large table or sort it without an index;
+test_query_plans fails when that list is not empty. Which indexes apply
+does not depend on the data, so the first check holds on any site. Scans of
+small tables are what the optimizer should pick there, so the second only
+finds problems on a site with production-sized data. Run it on one with:
+
+    bench --site <site> execute unicom_chemist.unicom_chemist.query_indexes.check_query_plans
+"""
+
+import frappe
+from frappe.utils import cint
+
+from unicom_chemist.unicom_chemist import (
+    batch_expiry_dashboard,
+    dashboard,
+    invoice_report,
+    warehouse_stock,
+)
+
+
+# (doctype, index name, columns); columns missing on a site are skipped with their index
+INDEXES = (
+    # UCL reports: docstatus/company/is_pos, then the optional filter, then the sort order
+    ("Sales Invoice", "ucl_company_pos_date", ("company", "is_pos", "docstatus", "posting_date", "creation", "name")),
+    ("Sales Invoice", "ucl_company_pos_branch_date", ("company", "is_pos", "docstatus", "branch", "posting_date", "creation", "name")),
+    ("Sales Invoice", "ucl_company_pos_customer_date", ("company", "is_pos", "docstatus", "customer", "posting_date", "creation", "name")),
+    ("Sales Invoice", "ucl_company_pos_status_date", ("company", "is_pos", "docstatus", "status", "posting_date", "creation", "name")),
+    # Dashboards: submitted invoices in a period, optionally for one branch
+    ("Sales Invoice", "ucl_docstatus_date", ("docstatus", "posting_date")),
+    ("Sales Invoice", "ucl_branch_docstatus_date", ("branch", "docstatus", "posting_date")),
+    # Unicom Dashboard: items per movement class of all branches
+    ("Item", "ucl_abc_category", ("custom_abc_category",)),
+)
+
+# Index scans that read the whole table or index
+FULL_SCAN_TYPES = ("ALL", "index")
+
+# Estimated rows below which a scan is the better plan and is not reported
+SMALL_TABLE_ROWS = 1000
+
+# Queries that read a whole table by design, with the reason
+ACCEPTED_SCANS = {
+    "Unicom Dashboard items in stock: all branches": "counts every Bin with stock, precomputed by dashboard_cache",
+    "Batch Expiry Dashboard counts: default view": "sums the whole batch ledger, precomputed by dashboard_cache",
+    "Batch Expiry Dashboard page: default view": "sums the whole batch ledger, precomputed by dashboard_cache",
+}
+
+SAMPLE_FILTERS = {
+    "company": "_Test Company",
+    "from_date": "2026-01-01",
+    "to_date": "2026-12-31",
+    "branch": "_Test Branch",
+    "customer": "_Test Customer",
+    "item": "_Test Item",
+    "warehouse": "_Test Warehouse - _TC",
+}
+
+
+def ensure_indexes():
+    for doctype, index_name, columns in INDEXES:
+        if all(frappe.db.has_column(doctype, column) for column in columns if column != "name"):
+            frappe.db.add_index(doctype, list(columns), index_name)
+
+
+def get_report_queries():
+    sample = {key: SAMPLE_FILTERS[key] for key in ("company", "from_date", "to_date")}
+    # label: (filters, index they are served by)
+    filter_sets = {
+        "company and period": ({}, "ucl_company_pos_date"),
+        "branch": ({"branch": SAMPLE_FILTERS["branch"]}, "ucl_company_pos_branch_date"),
+        "customer": ({"customer": SAMPLE_FILTERS["customer"]}, "ucl_company_pos_customer_date"),
+        "status": ({"status": "Unpaid"}, "ucl_company_pos_status_date"),
+    }
+
+    for label, (extra_filters, index) in filter_sets.items():
+        for is_pos in (0, 1):
+            filters = frappe._dict(sample, **extra_filters)
+            conditions, params = invoice_report.get_conditions(filters, is_pos)
+            params["status_date"] = "2026-06-30"
+            yield (
+                f"UCL invoice report (is_pos={is_pos}): {label}",
+                *invoice_report.get_page_query(conditions, params),
+                index,
+            )
+            yield (
+                f"UCL invoice report totals (is_pos={is_pos}): {label}",
+                *invoice_report.get_totals_query(conditions, params),
+                index,
+            )
+
+
+def get_dashboard_queries():
+    from_date, to_date = dashboard.get_period("monthly")
+
+    for branch in (None, SAMPLE_FILTERS["branch"]):
+        scope = "branch" if branch else "all branches"
+        invoice_index = "ucl_branch_docstatus_date" if branch else "ucl_docstatus_date"
+        # label: (builder, args, index added for the query or None)
+        builders = {
+            "sales totals": (dashboard.get_rollup_totals_query, (from_date, to_date, branch), None),
+            "customers": (dashboard.get_customer_count_query, (from_date, to_date, branch), invoice_index),
+            "purchase revenue": (dashboard.get_purchase_revenue_query, (from_date, to_date, branch), None),
+            "items in stock": (dashboard.get_items_in_stock_query, (branch,), None),
+            "item movement": (
+                dashboard.get_item_movement_query,
+                (from_date, to_date, branch, "DESC"),
+                invoice_index,
+            ),
+            "movement counts": (dashboard.get_movement_counts_query, (branch,), None if branch else "ucl_abc_category"),
+            "sales performance": (dashboard.get_sales_performance_query, (branch,), None),
+            "sales trends": (dashboard.get_sales_trends_query, (branch,), invoice_index),
+        }
+        for label, (builder, args, index) in builders.items():
+            yield (f"Unicom Dashboard {label}: {scope}", *builder(*args), index)
+
+
+def get_batch_expiry_queries():
+    filter_sets = {
+        "default view": {},
+        "item": {"item": SAMPLE_FILTERS["item"]},
+        "warehouse": {"warehouse": SAMPLE_FILTERS["warehouse"]},
+        "warehouse, custom thresholds and status": {
+            "warehouse": SAMPLE_FILTERS["warehouse"],
+            "use_immediately": 90,
+            "status": "Use Immediately",
+        },
+    }
+
+    for label, filters in filter_sets.items():
+        counts_query, page_query, params = batch_expiry_dashboard.get_queries(**filters)
+        yield f"Batch Expiry Dashboard counts: {label}", counts_query, params, None
+        yield f"Batch Expiry Dashboard page: {label}", page_query, params, None
+
+
+def get_warehouse_stock_queries():
+    for label, search in (("all items", None), ("search", "para")):
+        totals_query, page_query, params = warehouse_stock.get_queries(
+            warehouse_stock.CENTRAL_WAREHOUSE, SAMPLE_FILTERS["company"], search
+        )
+        yield f"Centralized Warehouse totals: {label}", totals_query, params, None
+        yield f"Centralized Warehouse page: {label}", page_query, params, None
+
+
+# Sources of (label, query, params, index added for the query or None) to check
+QUERY_SOURCES = [
+    get_report_queries,
+    get_dashboard_queries,
+    get_batch_expiry_queries,
+    get_warehouse_stock_queries,
+]
+
+
+def explain(query, params):
+    return frappe.db.sql(f"EXPLAIN {query}", params, as_dict=True)
+
+
+def get_plan_problems(plan, index=None):
+    """Why the plan the optimizer picked is not acceptable: [problem], empty when it is.
+
+    `index` must be among the keys some step can use, whatever the size of the table.
+    """
+    if index and not any(
+        index in (step.get("possible_keys") or "").split(",") or step.get("key") == index for step in plan
+    ):
+        return [f"does not consider index {index}"]
+
+    if any("Impossible WHERE" in (step.get("Extra") or "") for step in plan):
+        # Nothing to read, e.g. on an empty test site
+        return []
+
+    problems = []
+    for step in plan:
+        table = step.get("table") or ""
+        extra = step.get("Extra") or ""
+        if table.startswith("<") or cint(step.get("rows")) < SMALL_TABLE_ROWS:
+            # Derived tables and unions are read from what their own steps produced
+            continue
+
+        if step.get("type") in FULL_SCAN_TYPES:
+            problems.append(f"scans {table} ({step.get('type')}, {step.get('rows')} rows)")
+        elif "filesort" in extra and "temporary" not in extra:
+            # Grouped and windowed results are sorted in a temporary table anyway, table rows need not be
+            problems.append(f"sorts {table} without an index (key {step.get('key')}, {step.get('rows')} rows)")
+
+    return problems
+
+
+def check_query_plans():
+    """[(label, problem)] for every registered query whose plan misses its index, or scans or sorts a large table"""
+    problems = []
+
+    for source in QUERY_SOURCES:
+        for label, query, params, index in source():
+            if label in ACCEPTED_SCANS:
+                continue
+            problems.extend((label, problem) for problem in get_plan_problems(explain(query, params), index))
+
+    return problems
@@ -57,6 +57,19 @@ frappe.query_reports["Sales Invoice Report UCL"] = {
                     }
                 };
             }
+        },
+        {
+            "fieldname": "page_length",
+            "label": __("Rows per Page"),
+            "fieldtype": "Select",
+            "options": "100\n500\n1000\n5000",
+            "default": "500"
+        },
+        {
+            "fieldname": "cursor",
+            "label": __("Cursor"),
+            "fieldtype": "Data",
+            "hidden": 1
         }
     ],
     
@@ -97,6 +110,12 @@ frappe.query_reports["Sales Invoice Report UCL"] = {
             report.print_report();
         });
         
+        // Background export and keyset paging, shared with the other UCL invoice report
+        frappe.require("/assets/unicom_chemist/js/invoice_report_ucl.js", function() {
+            unicom_chemist.invoice_report.setup_export(report);
+            unicom_chemist.invoice_report.setup_paging(report);
+        });
+        
         // Add custom buttons
         report.page.add_inner_button(__("Create Payment Entry"), function() {
             let selected_rows = report.get_checked_items();
@@ -1,7 +1,15 @@
 import frappe
 from frappe import _
+from frappe.utils import getdate
 from hrms.payroll.doctype.salary_slip.salary_slip import SalarySlip
 
+from unicom_chemist.unicom_chemist.income_tax import get_income_tax_table
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
+
+# Deductions taken off before income tax (SSF, provident fund, tax relief)
+TAX_EXEMPT_DEDUCTIONS = frozenset(("S.S.F", "Provident Fund IT", "Tax Relief IT"))
+
 
 class CustomSalarySlip(SalarySlip):
     """Custom Salary Slip with Income Tax override"""
@@ -53,54 +61,52 @@ class CustomSalarySlip(SalarySlip):
     def calculate_custom_income_tax(self):
         """Calculate Income Tax using custom formula"""
         
-        # Use gross pay as base (monthly salary)
-        base = self.gross_pay
-        
-        # Custom formula: base - SSF(5.5%) - PF(3%) - Tax Relief(150)
-        taxable_in_formula = base - (base * 0.055) - (base * 0.03) - 150
-        
-        # Apply progressive tax rates based on taxable income
-        if taxable_in_formula > 730:
-            custom_tax = 0 + (110 * 0.05) + (130 * 0.10) + ((taxable_in_formula - 730) * 0.175)
-        elif taxable_in_formula > 600:
-            custom_tax = (taxable_in_formula - 600) * 0.10 + 5.5
-        elif taxable_in_formula > 490:
-            custom_tax = (taxable_in_formula - 490) * 0.05
-        else:
-            custom_tax = 0
-        
-        # Log the calculation for debugging
-        frappe.logger().info(
-            f"Custom Income Tax Calculation: Base={base}, Taxable={taxable_in_formula:.2f}, Tax={custom_tax:.2f}"
-        )
+        with Span("salary_slip.calculate_custom_income_tax", slip=self.name) as span:
+            # Use gross pay as base (monthly salary)
+            base = self.gross_pay
+            
+            # Brackets, SSF, PF and tax relief of the Income Tax Bracket Config in effect
+            tax_table = self.get_income_tax_table()
+            taxable_in_formula = tax_table.get_taxable_amount(base)
+            custom_tax = tax_table.get_tax(taxable_in_formula)
+            
+            # Log the calculation for debugging
+            span.log("Base={0}, Taxable={1:.2f}, Tax={2:.2f}", base, taxable_in_formula, custom_tax)
         
         return custom_tax
     
+    def get_income_tax_table(self):
+        """The bulk payroll chunk's table when it is for this slip's dates, otherwise the cached one"""
+        shared = frappe.flags.payroll_shared_inputs
+        if shared and shared.start_date == getdate(self.start_date):
+            return shared.income_tax_table
+
+        return get_income_tax_table(self.start_date)
+    
     def compute_income_tax_breakup(self):
         """Override to ensure deductions_before_tax_calculation is set correctly"""
         
-        # Call parent method first
-        super().compute_income_tax_breakup()
-        
-        # Manually calculate deductions_before_tax_calculation regardless of allow_tax_exemption
-        # This should include SSF + Provident Fund IT + Tax Relief IT
-        deductions_before_tax = 0
-        
-        for deduction in self.deductions:
-            if deduction.exempted_from_income_tax and deduction.salary_component in ['S.S.F', 'Provident Fund IT', 'Tax Relief IT']:
-                deductions_before_tax += deduction.amount
-        
-        # Set the correct monthly value (don't multiply by 12)
-        self.deductions_before_tax_calculation = deductions_before_tax
-        
-        # Recalculate annual_taxable_amount with correct deductions
-        self.annual_taxable_amount = self.total_earnings - (
-            self.non_taxable_earnings
-            + self.deductions_before_tax_calculation
-            + self.tax_exemption_declaration
-            + self.standard_tax_exemption_amount
-        )
-        
-        frappe.logger().info(
-            f"Custom Deductions Before Tax: Monthly={deductions_before_tax}, Annual={self.deductions_before_tax_calculation}"
-        )
+        with Span("salary_slip.compute_income_tax_breakup", slip=self.name) as span:
+            # Call parent method first
+            super().compute_income_tax_breakup()
+            
+            # Manually calculate deductions_before_tax_calculation regardless of allow_tax_exemption
+            # This should include SSF + Provident Fund IT + Tax Relief IT
+            deductions_before_tax = 0
+            
+            for deduction in self.deductions:
+                if deduction.exempted_from_income_tax and deduction.salary_component in TAX_EXEMPT_DEDUCTIONS:
+                    deductions_before_tax += deduction.amount
+            
+            # Set the correct monthly value (don't multiply by 12)
+            self.deductions_before_tax_calculation = deductions_before_tax
+            
+            # Recalculate annual_taxable_amount with correct deductions
+            self.annual_taxable_amount = self.total_earnings - (
+                self.non_taxable_earnings
+                + self.deductions_before_tax_calculation
+                + self.tax_exemption_declaration
+                + self.standard_tax_exemption_amount
+            )
+            
+            span.log("Deductions Before Tax: Monthly={0}, Annual={1}", deductions_before_tax, self.deductions_before_tax_calculation)
@@ -2,44 +2,64 @@ import frappe
 from frappe import _
 from erpnext.accounts.doctype.sales_invoice.sales_invoice import SalesInvoice
 
+from unicom_chemist.unicom_chemist.batch_expiry import get_batch_expiry_map
+from unicom_chemist.unicom_chemist.expiry_discount import apply_expiry_discount
+from unicom_chemist.unicom_chemist.instrumentation import Span
+
 
 class CustomSalesInvoice(SalesInvoice):
     """Custom Sales Invoice class for Unicom Chemist"""
     
     def onload(self):
         super().onload()
-        self.fetch_batch_expiry_for_all_items()
+        # Submitted and cancelled invoices cannot be saved, so there is nothing to resolve
+        if self.docstatus == 0:
+            self.fetch_batch_expiry_for_all_items()
     
     def validate(self):
+        # Before the standard validate so its calculate_taxes_and_totals picks up the discounted rates
+        if self.docstatus == 0:
+            apply_expiry_discount(self)
         super().validate()
         self.fetch_batch_expiry_for_all_items()
     
     def fetch_batch_expiry_for_all_items(self):
-        """Fetch batch expiry dates for all items with serial_and_batch_bundle"""
-        frappe.logger().info(f"DEBUG: fetch_batch_expiry_for_all_items called for Sales Invoice {self.name}")
-        
-        for idx, item in enumerate(self.items):
-            frappe.logger().info(f"DEBUG: Processing item {idx + 1}: {item.item_code}")
+        """Fetch batch expiry dates for items whose serial_and_batch_bundle is new or changed"""
+        with Span("sales_invoice.fetch_batch_expiry", invoice=self.name) as span:
+            items = self.get_items_with_changed_bundle()
+            span.count("rows", len(self.items))
+            span.count("changed_rows", len(items))
+            if not items:
+                return
             
-            if hasattr(item, 'serial_and_batch_bundle') and item.serial_and_batch_bundle:
-                frappe.logger().info(f"DEBUG: Item has bundle: {item.serial_and_batch_bundle}")
-                
-                batch_expiry = self.get_batch_expiry_from_bundle(item.serial_and_batch_bundle)
-                frappe.logger().info(f"DEBUG: Retrieved batch expiry: {batch_expiry}")
+            # Resolve every changed bundle on the invoice in a single query
+            expiry_map = get_batch_expiry_map(item.serial_and_batch_bundle for item in items)
+            span.count("bundles_resolved", len(expiry_map))
+            
+            for item in items:
+                batch_expiry = expiry_map.get(item.serial_and_batch_bundle)
+                span.log("row {0} {1} bundle={2} expiry={3}", item.idx, item.item_code, item.serial_and_batch_bundle, batch_expiry)
                 
                 if batch_expiry and hasattr(item, 'custom_bundle_expiry_date'):
                     item.custom_bundle_expiry_date = batch_expiry
-                    frappe.logger().info(f"DEBUG: Set custom_bundle_expiry_date to: {batch_expiry}")
-                else:
-                    if not batch_expiry:
-                        frappe.logger().info("DEBUG: No batch expiry returned")
-                    if not hasattr(item, 'custom_bundle_expiry_date'):
-                        frappe.logger().info("DEBUG: custom_bundle_expiry_date field not found on item")
-            else:
-                if not hasattr(item, 'serial_and_batch_bundle'):
-                    frappe.logger().info("DEBUG: Item does not have serial_and_batch_bundle field")
-                else:
-                    frappe.logger().info("DEBUG: Item serial_and_batch_bundle is empty")
+    
+    def get_items_with_changed_bundle(self):
+        """Items whose bundle differs from the stored value, or that have no expiry yet"""
+        if self.is_new():
+            previous_bundles = {}
+        else:
+            # On onload there is no doc before save: the rows are the stored values
+            previous = self.get_doc_before_save() or self
+            previous_bundles = {d.name: d.get("serial_and_batch_bundle") for d in previous.items}
+        
+        return [
+            item for item in self.items
+            if item.get("serial_and_batch_bundle")
+            and (
+                not item.get("custom_bundle_expiry_date")
+                or previous_bundles.get(item.name) != item.serial_and_batch_bundle
+            )
+        ]
     
     def get_batch_expiry_from_bundle(self, bundle_name):
         """Get batch expiry date from Serial and Batch Bundle child table"""
@@ -47,87 +67,58 @@ class CustomSalesInvoice(SalesInvoice):
             return None
         
         try:
-            # Get the Serial and Batch Bundle document
-            bundle_doc = frappe.get_doc("Serial and Batch Bundle", bundle_name)
-            
-            # Get custom_batch_expiry from first entry in child table
-            if hasattr(bundle_doc, 'entries') and bundle_doc.entries:
-                first_entry = bundle_doc.entries[0]
-                if hasattr(first_entry, 'custom_batch_expiry') and first_entry.custom_batch_expiry:
-                    return first_entry.custom_batch_expiry
-            
-            return None
-            
+            return get_batch_expiry_map([bundle_name]).get(bundle_name)
         except Exception as e:
             frappe.log_error(f"Error fetching batch expiry from bundle {bundle_name}: {str(e)}")
             return None
 
 
+@frappe.whitelist()
+def get_batch_expiry_for_bundles(bundle_names):
+    """Bulk API returning {bundle_name: expiry_date} for a list of Serial and Batch Bundles"""
+    bundle_names = frappe.parse_json(bundle_names) or []
+    if isinstance(bundle_names, str):
+        bundle_names = [bundle_names]
+
+    return get_batch_expiry_map(bundle_names)
+
+
 @frappe.whitelist()
 def get_batch_expiry_from_bundle_api(bundle_name):
     """API method to get batch expiry date from Serial and Batch Bundle"""
-    print(f"=== BATCH EXPIRY API CALLED ===")
-    print(f"DEBUG: get_batch_expiry_from_bundle_api called with bundle_name: {bundle_name}")
-    frappe.logger().info(f"DEBUG: get_batch_expiry_from_bundle_api called with bundle_name: {bundle_name}")
-    
     if not bundle_name:
-        print("DEBUG: bundle_name is empty or None")
-        frappe.logger().info("DEBUG: bundle_name is empty or None")
         return {"success": False, "error": "Bundle name is required", "debug": "bundle_name is empty"}
     
-    try:
-        # Check if bundle exists
-        if not frappe.db.exists("Serial and Batch Bundle", bundle_name):
-            frappe.logger().info(f"DEBUG: Bundle {bundle_name} does not exist in database")
-            return {"success": False, "error": f"Bundle {bundle_name} not found", "debug": "bundle not found"}
-        
-        bundle_doc = frappe.get_doc("Serial and Batch Bundle", bundle_name)
-        print(f"DEBUG: Retrieved bundle document: {bundle_doc.name}")
-        frappe.logger().info(f"DEBUG: Retrieved bundle document: {bundle_doc.name}")
-        
-        # Log all fields in the bundle document for debugging
-        all_fields = list(bundle_doc.as_dict().keys())
-        print(f"DEBUG: Bundle document fields: {all_fields}")
-        frappe.logger().info(f"DEBUG: Bundle document fields: {all_fields}")
-        
-        # Check if bundle has entries (child table)
-        if hasattr(bundle_doc, 'entries') and bundle_doc.entries:
-            print(f"DEBUG: Bundle has {len(bundle_doc.entries)} entries")
-            frappe.logger().info(f"DEBUG: Bundle has {len(bundle_doc.entries)} entries")
+    with Span("sales_invoice.get_batch_expiry_from_bundle_api", bundle=bundle_name) as span:
+        try:
+            # Served from the batch expiry cache; only misses fall through to the checks below
+            expiry_date = get_batch_expiry_map([bundle_name]).get(bundle_name)
+            if expiry_date:
+                span.count("bundles_resolved")
+                return {"success": True, "expiry_date": expiry_date, "debug": f"found expiry date in child table: {expiry_date}"}
             
-            # Get the first entry (all batches have same expiry as per user)
-            first_entry = bundle_doc.entries[0]
-            print(f"DEBUG: First entry fields: {[attr for attr in dir(first_entry) if not attr.startswith('_')]}")
+            # Check if bundle exists
+            if not frappe.db.exists("Serial and Batch Bundle", bundle_name):
+                span.log("bundle does not exist")
+                return {"success": False, "error": f"Bundle {bundle_name} not found", "debug": "bundle not found"}
             
-            # Check if custom_batch_expiry field exists in child table
-            if hasattr(first_entry, 'custom_batch_expiry'):
-                expiry_date = first_entry.custom_batch_expiry
-                print(f"DEBUG: custom_batch_expiry field exists in child table, value: {expiry_date}")
-                print(f"DEBUG: Expiry date type: {type(expiry_date)}")
-                frappe.logger().info(f"DEBUG: custom_batch_expiry field exists in child table, value: {expiry_date}")
-                
-                if expiry_date:
-                    print(f"*** SUCCESS: Returning expiry date from child table: {expiry_date} ***")
-                    frappe.logger().info(f"DEBUG: Returning expiry date from child table: {expiry_date}")
-                    return {"success": True, "expiry_date": expiry_date, "debug": f"found expiry date in child table: {expiry_date}"}
-                else:
-                    print("DEBUG: custom_batch_expiry field is empty in child table")
-                    frappe.logger().info("DEBUG: custom_batch_expiry field is empty in child table")
-                    return {"success": False, "error": "Expiry date field is empty in child table", "debug": "expiry date field empty in child table"}
-            else:
-                print("DEBUG: custom_batch_expiry field does not exist in child table")
-                frappe.logger().info("DEBUG: custom_batch_expiry field does not exist in child table")
-                return {"success": False, "error": "custom_batch_expiry field not found in child table", "debug": "field not found in child table"}
-        else:
-            print("DEBUG: Bundle has no entries in child table")
-            frappe.logger().info("DEBUG: Bundle has no entries in child table")
-            return {"success": False, "error": "No entries found in Serial and Batch Bundle", "debug": "no entries in child table"}
+            first_entry = frappe.db.get_value(
+                "Serial and Batch Entry",
+                {"parent": bundle_name, "parenttype": "Serial and Batch Bundle"},
+                "name",
+                order_by="idx asc",
+            )
+            if not first_entry:
+                span.log("bundle has no entries")
+                return {"success": False, "error": "No entries found in Serial and Batch Bundle", "debug": "no entries in child table"}
             
-    except Exception as e:
-        error_msg = f"Error fetching batch expiry from bundle {bundle_name}: {str(e)}"
-        frappe.logger().error(f"DEBUG: Exception occurred: {error_msg}")
-        frappe.log_error(error_msg, "Batch Expiry Fetch Error")
-        return {"success": False, "error": str(e), "debug": f"exception: {str(e)}"}
+            span.log("custom_batch_expiry is empty on first entry {0}", first_entry)
+            return {"success": False, "error": "Expiry date field is empty in child table", "debug": "expiry date field empty in child table"}
+        
+        except Exception as e:
+            error_msg = f"Error fetching batch expiry from bundle {bundle_name}: {str(e)}"
+            frappe.log_error(error_msg, "Batch Expiry Fetch Error")
+            return {"success": False, "error": str(e), "debug": f"exception: {str(e)}"}
 
 
 @frappe.whitelist()
@@ -0,0 +1,71 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from unicom_chemist.unicom_chemist.payroll_entry_override import (
+	ACTIONS,
+	MAX_REPORTED_FAILURES,
+	complete_payroll_run,
+	get_failure_message,
+	get_run_key,
+	report_chunk,
+)
+
+
+class PayrollEntryStub:
+	"""What the chunk reporting reads and writes of a Payroll Entry"""
+
+	def __init__(self, name):
+		self.name = name
+		self.values = {}
+
+	def db_set(self, values):
+		self.values.update(values)
+
+
+class TestPayrollEntryOverride(FrappeTestCase):
+	def setUp(self):
+		self.payroll_entry = PayrollEntryStub("_Test Bulk Payroll Entry")
+		for action in ACTIONS:
+			run_key = get_run_key(self.payroll_entry.name, action)
+			frappe.cache.delete_value([run_key, f"{run_key}:finished"])
+
+	def test_completed_run(self):
+		self.assertEqual(report_chunk(self.payroll_entry, "create", 0, 2, ["_T-SS-1"], []), 1)
+		self.assertEqual(report_chunk(self.payroll_entry, "create", 1, 2, ["_T-SS-2"], []), 2)
+
+		complete_payroll_run(self.payroll_entry, "create")
+		self.assertEqual(
+			self.payroll_entry.values, {"status": "Submitted", "salary_slips_created": 1, "error_message": ""}
+		)
+
+	def test_failed_run(self):
+		failed = [("_T-EMP-2", "No salary structure")]
+		report_chunk(self.payroll_entry, "create", 0, 2, ["_T-SS-1"], [])
+		report_chunk(self.payroll_entry, "create", 1, 2, [], failed)
+
+		complete_payroll_run(self.payroll_entry, "create")
+		self.assertEqual(self.payroll_entry.values["status"], "Failed")
+		self.assertEqual(
+			self.payroll_entry.values["error_message"], get_failure_message(ACTIONS["create"][0], failed)
+		)
+		self.assertNotIn("salary_slips_created", self.payroll_entry.values)
+
+	def test_negative_pay_slips_do_not_fail_the_run(self):
+		report_chunk(self.payroll_entry, "submit", 0, 1, [], [], ["_T-SS-3"])
+
+		complete_payroll_run(self.payroll_entry, "submit")
+		self.assertEqual(
+			self.payroll_entry.values, {"status": "Submitted", "salary_slips_submitted": 1, "error_message": ""}
+		)
+
+	def test_failure_message(self):
+		failed = [(f"_T-EMP-{i}", "boom") for i in range(MAX_REPORTED_FAILURES + 5)]
+		lines = get_failure_message("Salary Slip creation", failed).split("\n")
+
+		self.assertIn(str(len(failed)), lines[0])
+		self.assertEqual(lines[1], "_T-EMP-0: boom")
+		self.assertEqual(len(lines), MAX_REPORTED_FAILURES + 2)
+		self.assertIn("5", lines[-1])
@@ -0,0 +1,21 @@
+# Copyright (c) 2026, Amit Kumar and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from unicom_chemist.unicom_chemist.query_indexes import check_query_plans, ensure_indexes, get_plan_problems
+
+
+class TestQueryPlans(FrappeTestCase):
+	def test_report_and_dashboard_queries_use_indexes(self):
+		ensure_indexes()
+		problems = check_query_plans()
+		self.assertFalse(problems, "\n".join(f"{label}: {problem}" for label, problem in problems))
+
+	def test_missing_index_is_reported_on_small_tables(self):
+		plan = [{"table": "si", "type": "ALL", "possible_keys": "PRIMARY", "key": None, "rows": 10, "Extra": ""}]
+		self.assertEqual(get_plan_problems(plan), [])
+		self.assertEqual(get_plan_problems(plan, "ucl_docstatus_date"), ["does not consider index ucl_docstatus_date"])
+
+		plan[0]["possible_keys"] = "PRIMARY,ucl_docstatus_date"
+		self.assertEqual(get_plan_problems(plan, "ucl_docstatus_date"), [])
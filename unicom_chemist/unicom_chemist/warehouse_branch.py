@@ -0,0 +1,28 @@
+import frappe
+
+from unicom_chemist.unicom_chemist.cache import get_cached_map, invalidate_cached_map
+
+
+WAREHOUSE_BRANCH_KEY = "unicom_chemist:warehouse_branch"
+
+
+def get_warehouse_branch_map():
+    """{warehouse: custom_branch} for all warehouses, loaded with one query and kept per process"""
+    return get_cached_map(
+        WAREHOUSE_BRANCH_KEY,
+        lambda: dict(frappe.get_all("Warehouse", fields=["name", "custom_branch"], as_list=True)),
+    )
+
+
+def get_warehouse_branches(warehouses):
+    """{warehouse: branch} for the distinct given warehouses; warehouses without a branch map to None"""
+    branch_map = get_warehouse_branch_map()
+    return {warehouse: branch_map.get(warehouse) for warehouse in set(warehouses) if warehouse}
+
+
+def get_warehouse_branch(warehouse):
+    return get_warehouse_branch_map().get(warehouse)
+
+
+def clear_warehouse_branch_cache(doc=None, method=None):
+    invalidate_cached_map(WAREHOUSE_BRANCH_KEY)
@@ -0,0 +1,113 @@
+"""Data of the Centralized Warehouse panel of the Unicom Dashboard.
+
+The panel lists the items stocked in the central warehouse and in none of
+the branch warehouses (warehouses with a `custom_branch`) of its company.
+Bins are joined with Item and summed in SQL, so the browser gets the
+warehouse totals and one searchable page instead of every Bin and Item.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+
+CENTRAL_WAREHOUSE = "Centralized Warehouse - UCL"
+
+DEFAULT_PAGE_LENGTH = 50
+MAX_PAGE_LENGTH = 500
+
+
+@frappe.whitelist()
+def get_central_warehouse_stock(
+    warehouse=CENTRAL_WAREHOUSE, search=None, page=1, page_length=DEFAULT_PAGE_LENGTH
+):
+    """{"totals": {"items", "qty", "value"}, "total": matching rows, "items": [rows of the page]}.
+
+    Totals cover all central-only items; `search` (item code or name) only
+    narrows the page and `total`. Rows are sorted by stock value.
+    """
+    if not frappe.has_permission("Bin", "read"):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    company = frappe.db.get_value("Warehouse", warehouse, "company")
+    if not company:
+        frappe.throw(_("Warehouse {0} not found").format(warehouse))
+
+    totals_query, page_query, params = get_queries(warehouse, company, search, page, page_length)
+    totals = frappe.db.sql(totals_query, params, as_dict=1)[0]
+    items = frappe.db.sql(page_query, params, as_dict=1)
+
+    total = items[0].total_rows if items else 0
+    for row in items:
+        del row["total_rows"]
+
+    return {
+        "warehouse": warehouse,
+        "totals": totals,
+        "total": total,
+        "items": items,
+    }
+
+
+def get_queries(warehouse, company, search=None, page=1, page_length=DEFAULT_PAGE_LENGTH):
+    """(totals query, page query, params) of the panel"""
+    page_length = min(cint(page_length) or DEFAULT_PAGE_LENGTH, MAX_PAGE_LENGTH)
+    params = {
+        "warehouse": warehouse,
+        "company": company,
+        "page_length": page_length,
+        "offset": (max(cint(page), 1) - 1) * page_length,
+    }
+    from_clause = get_from_clause()
+
+    totals_query = f"""
+        SELECT
+            COUNT(*) AS items,
+            IFNULL(SUM(bin.actual_qty), 0) AS qty,
+            IFNULL(SUM(bin.stock_value), 0) AS value
+        {from_clause}
+    """
+
+    search_condition = ""
+    if search:
+        params["search"] = f"%{search}%"
+        search_condition = "AND (item.name LIKE %(search)s OR item.item_name LIKE %(search)s)"
+
+    page_query = f"""
+        SELECT
+            bin.item_code,
+            item.item_name,
+            item.item_group,
+            item.stock_uom,
+            bin.actual_qty,
+            bin.reserved_qty,
+            bin.projected_qty,
+            bin.stock_value,
+            bin.valuation_rate,
+            COUNT(*) OVER () AS total_rows
+        {from_clause}
+        {search_condition}
+        ORDER BY bin.stock_value DESC, bin.item_code
+        LIMIT %(page_length)s OFFSET %(offset)s
+    """
+    return totals_query, page_query, params
+
+
+def get_from_clause():
+    """Bins with stock in the warehouse whose item has no stock in a branch warehouse of the company"""
+    return """
+        FROM `tabBin` bin
+        INNER JOIN `tabItem` item ON item.name = bin.item_code
+        WHERE bin.warehouse = %(warehouse)s
+        AND bin.actual_qty > 0
+        AND NOT EXISTS (
+            SELECT 1
+            FROM `tabBin` branch_bin
+            INNER JOIN `tabWarehouse` wh ON wh.name = branch_bin.warehouse
+            WHERE branch_bin.item_code = bin.item_code
+            AND branch_bin.warehouse != %(warehouse)s
+            AND branch_bin.actual_qty > 0
+            AND wh.company = %(company)s
+            AND IFNULL(wh.custom_branch, '') != ''
+        )
+    """